@@ -1,20 +1,30 @@
 """FastAPI REST API for AnnotationHub resources with flexible filtering."""
+import asyncio
+import contextlib
+import operator
 import os
+from collections import defaultdict
+from datetime import date, datetime
+from functools import lru_cache
 from typing import Optional, Annotated
-from fastapi import FastAPI, Query, HTTPException, Depends
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from fastapi import FastAPI, Query, HTTPException, Depends, Header
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncConnection
 from sqlalchemy import select, and_, func, desc
 from dotenv import load_dotenv
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
-from starlette.responses import Response
+from starlette.responses import Response, StreamingResponse
 import time
-import json
+import hashlib
+import hmac
+import orjson
 import sys
 from loguru import logger
 
 from hubs_api.pydantic_models import ResourceListResponse, ResourceModel
 from . import models
+from .db_utils import API_ENGINE_OPTIONS, _convert_to_async_url
 
 logger.remove()
 logger.add(sys.stdout, format="{message}", serialize=False)
@@ -23,12 +33,9 @@ load_dotenv()
 
 # Database setup
 DATABASE_URL = os.getenv("POSTGRES_URI", "postgresql+asyncpg://postgres@localhost:5432/ah")
-if not DATABASE_URL.startswith("postgresql+asyncpg://"):
-    DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://")
-    DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql+asyncpg://")
+DATABASE_URL = _convert_to_async_url(DATABASE_URL)
 
-engine = create_async_engine(DATABASE_URL, echo=False)
-async_session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+engine = create_async_engine(DATABASE_URL, **API_ENGINE_OPTIONS)
 
 
 # FastAPI app
@@ -36,13 +43,15 @@ app = FastAPI(
     title="AnnotationHub API",
     description="REST API for querying AnnotationHub resources with flexible filtering",
     version="0.1.0",
+    default_response_class=ORJSONResponse,
 )
 
 
-async def get_db():
-    """Dependency to get database session."""
-    async with async_session_maker() as session:
-        yield session
+async def get_conn():
+    """Dependency to get a read-only autocommit connection (no ORM session)."""
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        yield conn
 
 
 def parse_filter_value(value: str, field_type: type):
@@ -52,12 +61,63 @@ def parse_filter_value(value: str, field_type: type):
             return field_type(value)
         except ValueError:
             raise HTTPException(status_code=400, detail=f"Invalid numeric value: {value}")
+    if field_type in (date, datetime):
+        try:
+            return field_type.fromisoformat(value)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid date value: {value}")
     return value
 
 
-def apply_filters(query, table, filters: dict):
+@lru_cache(maxsize=None)
+def _column_python_type(column) -> type:
+    """Python type a column's filter values should be parsed to."""
+    try:
+        return column.type.python_type
+    except NotImplementedError:
+        return str
+
+
+def _compare(op):
+    """Build a comparison handler that binds a value typed for the column."""
+    return lambda column, value: op(column, parse_filter_value(value, _column_python_type(column)))
+
+
+def _is_truthy(value: str) -> bool:
+    return value.lower() in ("true", "1", "yes")
+
+
+# Operator suffix -> condition builder
+_OP_HANDLERS = {
+    "eq": lambda column, value: column == value,
+    "contains": lambda column, value: column.contains(value),
+    "icontains": lambda column, value: column.ilike(f"%{value}%"),
+    "startswith": lambda column, value: column.startswith(value),
+    "endswith": lambda column, value: column.endswith(value),
+    "in": lambda column, value: column.in_([v.strip() for v in value.split(",")]),
+    "not": lambda column, value: column != value,
+    "ne": lambda column, value: column != value,
+    "gt": _compare(operator.gt),
+    "gte": _compare(operator.ge),
+    "lt": _compare(operator.lt),
+    "lte": _compare(operator.le),
+    "is_null": lambda column, value: column.is_(None) if _is_truthy(value) else column.is_not(None),
+    "is_not_null": lambda column, value: column.is_not(None) if _is_truthy(value) else column.is_(None),
+}
+
+
+@lru_cache(maxsize=256)
+def _split_filter_param(param: str) -> tuple[str, str]:
+    """Split a ``field__operator`` parameter name into ``(field, operator)``."""
+    if "__" in param:
+        field_name, operator = param.rsplit("__", 1)
+        return field_name, operator
+    return param, "eq"
+
+
+def build_filter_conditions(table, filters: dict) -> list:
     """
-    Apply filters to a SQLAlchemy query based on field operators.
+    Build filter conditions for a table based on field operators.
     
     Supports operators:
     - No suffix or __eq: exact match
@@ -72,87 +132,45 @@ def apply_filters(query, table, filters: dict):
     - __is_not_null: field IS NOT NULL
     """
     conditions = []
-    
-    # Get column objects for validation
-    columns = {col.name: col for col in table.c}
+    columns = table.c
     
     for param, value in filters.items():
         if value is None:
             continue
-            
-        # Parse field and operator
-        if "__" in param:
-            parts = param.rsplit("__", 1)
-            field_name = parts[0]
-            operator = parts[1]
-        else:
-            field_name = param
-            operator = "eq"
+        
+        field_name, operator = _split_filter_param(param)
         
         # Validate field exists
         if field_name not in columns:
             raise HTTPException(status_code=400, detail=f"Unknown field: {field_name}")
         
-        column = columns[field_name]
-        
-        # Apply operator
-        if operator == "eq":
-            conditions.append(column == value)
-        
-        elif operator == "contains":
-            conditions.append(column.contains(value))
-        
-        elif operator == "icontains":
-            conditions.append(column.ilike(f"%{value}%"))
-        
-        elif operator == "startswith":
-            conditions.append(column.startswith(value))
-        
-        elif operator == "endswith":
-            conditions.append(column.endswith(value))
-        
-        elif operator == "in":
-            # Split comma-separated values
-            values = [v.strip() for v in value.split(",")]
-            conditions.append(column.in_(values))
-        
-        elif operator in ("not", "ne"):
-            conditions.append(column != value)
-        
-        elif operator == "gt":
-            conditions.append(column > parse_filter_value(value, int))
-        
-        elif operator == "gte":
-            conditions.append(column >= parse_filter_value(value, int))
-        
-        elif operator == "lt":
-            conditions.append(column < parse_filter_value(value, int))
-        
-        elif operator == "lte":
-            conditions.append(column <= parse_filter_value(value, int))
-        
-        elif operator == "is_null":
-            # value should be "true" or "false"
-            if value.lower() in ("true", "1", "yes"):
-                conditions.append(column.is_(None))
-            else:
-                conditions.append(column.is_not(None))
-        
-        elif operator == "is_not_null":
-            if value.lower() in ("true", "1", "yes"):
-                conditions.append(column.is_not(None))
-            else:
-                conditions.append(column.is_(None))
-        
-        else:
+        handler = _OP_HANDLERS.get(operator)
+        if handler is None:
             raise HTTPException(status_code=400, detail=f"Unknown operator: {operator}")
+        
+        conditions.append(handler(columns[field_name], value))
     
+    return conditions
+
+
+def apply_filters(query, table, filters: dict):
+    """Apply filters to a SQLAlchemy query (see `build_filter_conditions`)."""
+    conditions = build_filter_conditions(table, filters)
     if conditions:
         query = query.where(and_(*conditions))
-    
     return query
 
 
+@lru_cache(maxsize=None)
+def _sort_map(table) -> dict:
+    """Map every ``field``/``-field`` sort token of a table to its ORDER BY clause."""
+    sort_map = {}
+    for column in table.c:
+        sort_map[column.name] = column.asc()
+        sort_map[f"-{column.name}"] = column.desc()
+    return sort_map
+
+
 def apply_sorting(query, table, sort: Optional[str]):
     """
     Apply sorting to query.
@@ -163,30 +181,18 @@ def apply_sorting(query, table, sort: Optional[str]):
     if not sort:
         return query
     
-    columns = {col.name: col for col in table.c}
-    
+    sort_map = _sort_map(table)
+    order_by = []
     for sort_expr in sort.split(","):
         sort_expr = sort_expr.strip()
         if not sort_expr:
             continue
-        
-        if sort_expr.startswith("-"):
-            field_name = sort_expr[1:]
-            descending = True
-        else:
-            field_name = sort_expr
-            descending = False
-        
-        if field_name not in columns:
-            raise HTTPException(status_code=400, detail=f"Unknown sort field: {field_name}")
-        
-        column = columns[field_name]
-        if descending:
-            query = query.order_by(column.desc())
-        else:
-            query = query.order_by(column.asc())
+        try:
+            order_by.append(sort_map[sort_expr])
+        except KeyError:
+            raise HTTPException(status_code=400, detail=f"Unknown sort field: {sort_expr.lstrip('-')}")
     
-    return query
+    return query.order_by(*order_by)
 
 
 class JSONLoggingMiddleware(BaseHTTPMiddleware):
@@ -194,18 +200,14 @@ class JSONLoggingMiddleware(BaseHTTPMiddleware):
         start_time = time.time()
         response: Response = await call_next(request)
         process_time = time.time() - start_time
-        # Parse query params into a dict (support multi-values)
-        qp = {}
-        for key, value in request.query_params.multi_items():
-            # accumulate multiple values under same key as list
-            if key in qp:
-                existing = qp[key]
-                if isinstance(existing, list):
-                    existing.append(value)
-                else:
-                    qp[key] = [existing, value]
-            else:
-                qp[key] = value
+        # Parse query params into a dict; only repeated keys need list handling
+        items = request.query_params.multi_items()
+        qp = dict(items)
+        if len(qp) != len(items):
+            grouped = defaultdict(list)
+            for key, value in items:
+                grouped[key].append(value)
+            qp = {key: values[0] if len(values) == 1 else values for key, values in grouped.items()}
 
         log_data = {
             "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
@@ -218,7 +220,7 @@ class JSONLoggingMiddleware(BaseHTTPMiddleware):
             "client_ip": request.client.host if request.client else None,
             "user_agent": request.headers.get("user-agent"),
         }
-        logger.info(json.dumps(log_data))
+        logger.info(orjson.dumps(log_data).decode())
         return response
 
 
@@ -241,7 +243,7 @@ async def root():
 
 @app.get("/resources", response_model=ResourceListResponse)
 async def list_resources(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncConnection = Depends(get_conn),
     # Pagination
     limit: Annotated[int, Query(ge=1, le=1000)] = 100,
     offset: Annotated[int, Query(ge=0)] = 0,
@@ -308,58 +310,55 @@ async def list_resources(
     - `?genome__in=GRCh38,GRCh37&sort=-rdatadateadded`
     - `?description__icontains=chip&rdatadateadded__gte=2023-01-01`
     """
-    # Collect all query parameters
-    filter_params = {}
-    
-    for param_name, param_value in [
-        ("id", id),
-        ("ah_id", ah_id),
-        ("title", title),
-        ("title__contains", title__contains),
-        ("title__icontains", title__icontains),
-        ("dataprovider", dataprovider),
-        ("dataprovider__in", dataprovider__in),
-        ("species", species),
-        ("species__in", species__in),
-        ("species__contains", species__contains),
-        ("taxonomyid", taxonomyid),
-        ("genome", genome),
-        ("genome__in", genome__in),
-        ("description", description),
-        ("description__contains", description__contains),
-        ("description__icontains", description__icontains),
-        ("coordinate_1_based", coordinate_1_based),
-        ("maintainer", maintainer),
-        ("maintainer__contains", maintainer__contains),
-        ("status_id", status_id),
-        ("location_prefix_id", location_prefix_id),
-        ("recipe_id", recipe_id),
-        ("rdatadateadded", rdatadateadded),
-        ("rdatadateadded__gte", rdatadateadded__gte),
-        ("rdatadateadded__lte", rdatadateadded__lte),
-        ("rdatadateremoved", rdatadateremoved),
-        ("rdatadateremoved__gte", rdatadateremoved__gte),
-        ("rdatadateremoved__lte", rdatadateremoved__lte),
-        ("record_id", record_id),
-        ("preparerclass", preparerclass),
-    ]:
-        if param_value is not None:
-            filter_params[param_name] = param_value
+    # Collect the filters that were given
+    filters = {
+        "id": id,
+        "ah_id": ah_id,
+        "title": title,
+        "title__contains": title__contains,
+        "title__icontains": title__icontains,
+        "dataprovider": dataprovider,
+        "dataprovider__in": dataprovider__in,
+        "species": species,
+        "species__in": species__in,
+        "species__contains": species__contains,
+        "taxonomyid": taxonomyid,
+        "genome": genome,
+        "genome__in": genome__in,
+        "description": description,
+        "description__contains": description__contains,
+        "description__icontains": description__icontains,
+        "coordinate_1_based": coordinate_1_based,
+        "maintainer": maintainer,
+        "maintainer__contains": maintainer__contains,
+        "status_id": status_id,
+        "location_prefix_id": location_prefix_id,
+        "recipe_id": recipe_id,
+        "rdatadateadded": rdatadateadded,
+        "rdatadateadded__gte": rdatadateadded__gte,
+        "rdatadateadded__lte": rdatadateadded__lte,
+        "rdatadateremoved": rdatadateremoved,
+        "rdatadateremoved__gte": rdatadateremoved__gte,
+        "rdatadateremoved__lte": rdatadateremoved__lte,
+        "record_id": record_id,
+        "preparerclass": preparerclass,
+    }
+    filter_params = {name: value for name, value in filters.items() if value is not None}
     
     # Build query
+    conditions = build_filter_conditions(models.resources, filter_params)
     query = select(models.resources)
-    
-    # Apply filters
-    query = apply_filters(query, models.resources, filter_params)
+    if conditions:
+        query = query.where(and_(*conditions))
     
     # Apply sorting
     query = apply_sorting(query, models.resources, sort)
     
-    # Count total (before pagination)
-    count_query = select(func.count()).select_from(query.subquery())
-    total_result = await db.execute(count_query)
-    _total_val = total_result.scalar() if total_result else 0
-    total = int(_total_val or 0)
+    # Count total alongside the page with a window function (one round trip)
+    count_query = select(func.count()).select_from(models.resources)
+    if conditions:
+        count_query = count_query.where(and_(*conditions))
+    query = query.add_columns(func.count().over().label("total_count"))
     
     # Apply pagination
     query = query.limit(limit).offset(offset)
@@ -368,29 +367,16 @@ async def list_resources(
     result = await db.execute(query)
     rows = result.fetchall()
     
-    # Convert to dictionaries
-    resources_list = []
-    for row in rows:
-        resource_dict = {
-            "id": row.id,
-            "ah_id": row.ah_id,
-            "title": row.title,
-            "dataprovider": row.dataprovider,
-            "species": row.species,
-            "taxonomyid": row.taxonomyid,
-            "genome": row.genome,
-            "description": row.description,
-            "coordinate_1_based": row.coordinate_1_based,
-            "maintainer": row.maintainer,
-            "status_id": row.status_id,
-            "location_prefix_id": row.location_prefix_id,
-            "recipe_id": row.recipe_id,
-            "rdatadateadded": row.rdatadateadded.isoformat() if row.rdatadateadded else None,
-            "rdatadateremoved": row.rdatadateremoved.isoformat() if row.rdatadateremoved else None,
-            "record_id": row.record_id,
-            "preparerclass": row.preparerclass,
-        }
-        resources_list.append(ResourceModel(**resource_dict))
+    if rows:
+        total = int(rows[0].total_count)
+    elif offset:
+        # Paged past the end: the window has no rows to report the total on
+        total = int(await db.scalar(count_query) or 0)
+    else:
+        total = 0
+    
+    # Rows map straight onto the model; dates serialize to ISO strings
+    resources_list = [ResourceModel.model_validate(row) for row in rows]
     
     return ResourceListResponse(
         total=total,
@@ -401,8 +387,64 @@ async def list_resources(
     )
 
 
+# row_to_json emits one JSON document per row; CSV with control-character
+# quote/delimiter passes it through COPY without any escaping.
+_EXPORT_RESOURCES_SQL = "SELECT row_to_json(r) FROM public.resources r ORDER BY r.id"
+
+
+@app.get("/resources.ndjson")
+async def export_resources():
+    """
+    Stream all resources as newline-delimited JSON.
+    
+    Rows are produced by Postgres `COPY ... TO STDOUT` and forwarded to the
+    client as they arrive, without building Python row objects. Use
+    `/resources` for filtered, paginated queries.
+    """
+    async def generate():
+        async with engine.connect() as conn:
+            raw = await conn.get_raw_connection()
+            queue: asyncio.Queue = asyncio.Queue(maxsize=16)
+            
+            async def sink(chunk: bytes):
+                await queue.put(chunk)
+            
+            async def run_copy():
+                try:
+                    await raw.driver_connection.copy_from_query(
+                        _EXPORT_RESOURCES_SQL,
+                        output=sink,
+                        format="csv",
+                        delimiter="\x02",
+                        quote="\x01",
+                    )
+                except asyncio.CancelledError:
+                    # The reader is gone; nobody will wait for the sentinel
+                    raise
+                except BaseException:
+                    await queue.put(None)
+                    raise
+                await queue.put(None)
+            
+            copy_task = asyncio.create_task(run_copy())
+            try:
+                while (chunk := await queue.get()) is not None:
+                    yield chunk
+                await copy_task
+            finally:
+                if not copy_task.done():
+                    # Client went away mid-COPY: stop the copy before the
+                    # connection leaves this block, and don't pool it again
+                    copy_task.cancel()
+                    with contextlib.suppress(asyncio.CancelledError):
+                        await copy_task
+                    await conn.invalidate()
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
 @app.get("/health")
-async def health_check(db: AsyncSession = Depends(get_db)):
+async def health_check(db: AsyncConnection = Depends(get_conn)):
     """Health check endpoint - verifies database connectivity."""
     try:
         await db.execute(select(1))
@@ -410,13 +452,61 @@ async def health_check(db: AsyncSession = Depends(get_db)):
     except Exception as e:
         raise HTTPException(status_code=503, detail=f"Database error: {str(e)}")
 
+# /species only changes when the mirror runs, so serve it from memory. The
+# cache is per process: under several workers, /admin/cache/flush clears only
+# the worker that handles it, and the others refresh when the TTL expires.
+SPECIES_CACHE_TTL_SECONDS = 600
+_species_cache: dict = {"expires_at": 0.0, "body": b"", "etag": ""}
+
+
+def _clear_species_cache():
+    _species_cache["expires_at"] = 0.0
+
+
 @app.get("/species")
-async def get_species(db: AsyncSession = Depends(get_db)):
+async def get_species(request: Request):
     """Get a list of all species."""
-    try:
-        sql = select(models.resources.c.species, func.count().label('count')).group_by(models.resources.c.species).order_by(desc('count'))
-        result = await db.execute(sql)
-        resp = [{"species": row[0], "count": row[1]} for row in result.fetchall()]
-        return resp
-    except Exception as e:
-        raise HTTPException(status_code=503, detail=f"Database error: {str(e)}")
\ No newline at end of file
+    if time.monotonic() >= _species_cache["expires_at"]:
+        # Only a refresh needs a connection; cache hits never touch the pool
+        try:
+            sql = select(models.resources.c.species, func.count().label('count')).group_by(models.resources.c.species).order_by(desc('count'))
+            async with engine.connect() as db:
+                result = await db.execute(sql)
+                resp = [{"species": row[0], "count": row[1]} for row in result.fetchall()]
+        except Exception as e:
+            raise HTTPException(status_code=503, detail=f"Database error: {str(e)}")
+        body = orjson.dumps(resp)
+        _species_cache["body"] = body
+        _species_cache["etag"] = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        _species_cache["expires_at"] = time.monotonic() + SPECIES_CACHE_TTL_SECONDS
+
+    headers = {"ETag": _species_cache["etag"]}
+    if request.headers.get("if-none-match") == _species_cache["etag"]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=_species_cache["body"], media_type="application/json", headers=headers)
+
+
+# Admin endpoints are for operators: set HUBS_ADMIN_TOKEN and send it as
+# X-Admin-Token. Without a configured token they are disabled.
+ADMIN_TOKEN = os.getenv("HUBS_ADMIN_TOKEN")
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """Reject requests without the configured admin token."""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if x_admin_token is None or not hmac.compare_digest(x_admin_token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+@app.post("/admin/cache/flush", dependencies=[Depends(require_admin)])
+async def flush_cache():
+    """
+    Drop this worker's cached responses.
+
+    Caches are per process, so with several workers only the one handling
+    this request is flushed; the others serve /species for up to
+    SPECIES_CACHE_TTL_SECONDS (10 min) longer.
+    """
+    _clear_species_cache()
+    return {"status": "flushed"}
@@ -4,26 +4,38 @@ FastAPI REST API v2 for Bioconductor Hub resources.
 Supports the normalized PostgreSQL schema with nested entity relationships,
 comprehensive filtering, sorting, and pagination.
 """
+import asyncio
+import base64
+import hashlib
+import hmac
 import os
-from typing import Optional, List
-from fastapi import FastAPI, Query, HTTPException, Depends, Path
+import time
+import contextlib
+from contextlib import asynccontextmanager
+from datetime import datetime
+from functools import lru_cache
+from typing import Awaitable, Callable, Dict, Optional, List, Tuple
+import orjson
+from fastapi import FastAPI, Query, HTTPException, Depends, Header, Path, Request, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy import select, func, and_, or_
-from sqlalchemy.orm import selectinload, joinedload
+from sqlalchemy import select, func, and_, or_, intersect, tuple_
+from sqlalchemy.orm import contains_eager, selectinload, joinedload, noload, with_expression
 from dotenv import load_dotenv
 import sys
 from loguru import logger
 
 from .models import (
-    Resource, Species, Genome, DataProvider, Hub, Tag, ResourceTag, BiocRelease,
-    ResourceBiocVersion
+    Resource, Species, Genome, DataProvider, Recipe, User, Hub, Tag, ResourceTag,
+    BiocRelease, ResourceBiocVersion, ResourceFile, SourceFile
 )
 from .schemas import (
-    ResourceListResponse, ResourceDetailResponse, ResourceSchema,
-    ResourceDetailSchema, PaginationMeta, SpeciesSchema, TagSchema,
-    BiocReleaseSchema
+    ResourceListResponse, ResourceDetailResponse, ResourceDetailSchema,
+    PaginationMeta, SpeciesSchema, TagSchema, BiocReleaseSchema,
+    RESOURCE_LIST_ADAPTER,
 )
-from .db_utils import _convert_to_async_url
+from .db_utils import API_ENGINE_OPTIONS, _convert_to_async_url
 
 logger.remove()
 logger.add(sys.stdout, format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <level>{message}</level>")
@@ -34,9 +46,44 @@ load_dotenv()
 DATABASE_URL = os.getenv("POSTGRES_URI", "postgresql://postgres@localhost:5432/hubs_dev")
 DATABASE_URL = _convert_to_async_url(DATABASE_URL)
 
-engine = create_async_engine(DATABASE_URL, echo=False)
+engine = create_async_engine(DATABASE_URL, **API_ENGINE_OPTIONS)
 async_session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+# Bioconductor releases change a few times a year; resolve version -> id in
+# memory instead of joining bioc_releases on every filtered request
+BIOC_VERSION_REFRESH_SECONDS = 3600
+BIOC_VERSION_TO_ID: Dict[str, int] = {}
+
+
+async def refresh_bioc_versions() -> None:
+    """Reload the Bioconductor version -> release id mapping."""
+    global BIOC_VERSION_TO_ID
+    async with async_session_maker() as session:
+        result = await session.execute(select(BiocRelease.version, BiocRelease.id))
+        BIOC_VERSION_TO_ID = dict(result.all())
+
+
+async def _refresh_bioc_versions_periodically() -> None:
+    while True:
+        await asyncio.sleep(BIOC_VERSION_REFRESH_SECONDS)
+        try:
+            await refresh_bioc_versions()
+        except Exception as e:
+            logger.warning(f"Failed to refresh Bioconductor versions: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        await refresh_bioc_versions()
+    except Exception as e:
+        logger.warning(f"Failed to load Bioconductor versions: {e}")
+    refresher = asyncio.create_task(_refresh_bioc_versions_periodically())
+    yield
+    refresher.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await refresher
+
 
 # FastAPI app
 app = FastAPI(
@@ -53,6 +100,8 @@ Features:
 - Bioconductor version filtering
     """,
     version="2.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
 
@@ -140,15 +189,20 @@ def build_resource_filters(
     return conditions
 
 
-def parse_sort_param(sort: Optional[str]) -> List[tuple]:
+# Sortable Resource columns by name
+SORT_COLUMN_MAP = {column.key: getattr(Resource, column.key) for column in Resource.__table__.columns}
+
+
+@lru_cache(maxsize=256)
+def parse_sort_param(sort: Optional[str]) -> Tuple[tuple, ...]:
     """
-    Parse sort parameter into list of (field, direction) tuples.
+    Parse sort parameter into a tuple of (field, direction) tuples.
 
     Format: "field1,-field2,field3" where "-" prefix means descending.
-    Returns: [("field1", "asc"), ("field2", "desc"), ("field3", "asc")]
+    Returns: (("field1", "asc"), ("field2", "desc"), ("field3", "asc"))
     """
     if not sort:
-        return []
+        return ()
 
     result = []
     for part in sort.split(","):
@@ -159,22 +213,178 @@ def parse_sort_param(sort: Optional[str]) -> List[tuple]:
             result.append((part[1:], "desc"))
         else:
             result.append((part, "asc"))
-    return result
+    return tuple(result)
 
 
-def apply_sorting(query, sort_fields: List[tuple]):
-    """Apply sorting to query based on parsed sort fields."""
+@lru_cache(maxsize=256)
+def _sort_clauses(sort_fields: Tuple[tuple, ...]) -> tuple:
+    """Build ORDER BY clauses for parsed sort fields."""
+    clauses = []
     for field_name, direction in sort_fields:
-        if not hasattr(Resource, field_name):
+        column = SORT_COLUMN_MAP.get(field_name)
+        if column is None:
             raise HTTPException(status_code=400, detail=f"Unknown sort field: {field_name}")
+        clauses.append(column.desc() if direction == "desc" else column.asc())
+    return tuple(clauses)
+
+
+def apply_sorting(query, sort_fields: Tuple[tuple, ...]):
+    """Apply sorting to query based on parsed sort fields."""
+    clauses = _sort_clauses(sort_fields)
+    return query.order_by(*clauses) if clauses else query
+
+
+# Eager-loading rule: joinedload (or contains_eager) for *-to-one edges, and
+# selectinload for every *-to-many edge. Collections then arrive in one
+# bounded "WHERE resource_id IN (...)" query instead of multiplying rows in
+# the main join. Hops from a junction row to its single target (e.g.
+# ResourceTag.tag_obj) are *-to-one and stay joinedload.
+
+# Many-to-one relations embedded in every resource response
+TO_ONE_RELATIONSHIPS = (
+    Resource.hub,
+    Resource.species,
+    Resource.genome,
+    Resource.data_provider,
+    Resource.recipe,
+    Resource.maintainer,
+    Resource.status,
+)
+
+
+# ============================================================================
+# Pagination Utilities
+# ============================================================================
+
+# Sort order that keyset (cursor) pagination seeks on; backed by the
+# (created_at, id) index on resources.
+KEYSET_SORT = (("created_at", "desc"),)
+
+
+def encode_cursor(resource: Resource) -> str:
+    """Encode the (created_at, id) position of a resource as an opaque cursor."""
+    raw = f"{resource.created_at.isoformat()}|{resource.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """Decode a cursor produced by `encode_cursor` into (created_at, id)."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        created_at, resource_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(resource_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+# Rows fetched and serialized per round-trip when streaming resource pages
+RESOURCE_STREAM_BATCH_SIZE = 100
+
+def _clip_batch(batch: list, count: int, limit: int) -> Tuple[list, bool]:
+    """Trim a fetched batch to the page; returns (rows, whether the page is full)."""
+    if count + len(batch) > limit:
+        return batch[:limit - count], True
+    return batch, False
+
+
+def _render_batch(batch: list, context: dict) -> bytes:
+    """Validate and serialize a batch of resources as comma-joined JSON objects."""
+    if not batch:
+        return b""
+    # One adapter call per batch; strip the brackets so batches splice into
+    # a single streamed array
+    return RESOURCE_LIST_ADAPTER.dump_json(
+        RESOURCE_LIST_ADAPTER.validate_python(batch, from_attributes=True, context=context)
+    )[1:-1]
+
+
+# Rows fetched per round-trip by the full resource export
+RESOURCE_EXPORT_BATCH_SIZE = 500
+
+
+# Latest change to rows embedded in resource responses but stored outside
+# resources; folded into list ETags so link and lookup edits invalidate them.
+# Each column is b-tree indexed, so max() reads one index endpoint.
+EMBEDDED_VERSION_QUERIES = tuple(
+    select(func.max(column)).correlate(None).scalar_subquery()
+    for column in (
+        ResourceTag.added_at,
+        ResourceBiocVersion.added_at,
+        ResourceFile.updated_at,
+        SourceFile.created_at,
+        DataProvider.updated_at,
+        Recipe.updated_at,
+        User.updated_at,
+    )
+)
+
+# Filtered (total, max(updated_at), embedded versions) tuples change only
+# when data is loaded, so cache them briefly
+COUNT_CACHE_TTL_SECONDS = 30
+COUNT_CACHE_MAX_ENTRIES = 1024
+_count_cache: Dict[tuple, Tuple[float, tuple]] = {}
 
-        column = getattr(Resource, field_name)
-        if direction == "desc":
-            query = query.order_by(column.desc())
-        else:
-            query = query.order_by(column.asc())
 
-    return query
+def _get_cached_count(key: tuple) -> Optional[tuple]:
+    """Return cached (total, max_updated_at, ...) for a filter key, or None if absent or expired."""
+    entry = _count_cache.get(key)
+    if entry is None or entry[0] < time.monotonic():
+        return None
+    return entry[1]
+
+
+def _set_cached_count(key: tuple, stats: tuple) -> None:
+    """Cache (total, max_updated_at, ...) for a filter key."""
+    if len(_count_cache) >= COUNT_CACHE_MAX_ENTRIES:
+        _count_cache.clear()
+    _count_cache[key] = (time.monotonic() + COUNT_CACHE_TTL_SECONDS, stats)
+
+
+# ============================================================================
+# HTTP Caching Utilities
+# ============================================================================
+
+LIST_CACHE_CONTROL = "public, max-age=30, stale-while-revalidate=60"
+STATIC_CACHE_CONTROL = "public, max-age=3600"
+
+
+def make_etag(request: Request, *parts) -> str:
+    """Build a strong ETag from the query string and data-version parts."""
+    filter_hash = sorted(request.query_params.multi_items())
+    raw = "|".join(str(part) for part in (filter_hash, *parts))
+    return f'"{hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()}"'
+
+
+def check_etag(request: Request, response: Response, etag: str, cache_control: str) -> None:
+    """Answer a matching conditional GET with 304, otherwise set cache headers."""
+    if request.headers.get("if-none-match") == etag:
+        raise HTTPException(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+
+
+# Reference data (species, tags, releases) changes only on migration, so
+# serialized pages are served from memory. Caches are per process: with
+# `serve --workers N`, /admin/cache/flush clears only the worker that handles
+# it, and the others refresh when their TTL expires.
+REFERENCE_CACHE_TTL_SECONDS = 300
+RELEASE_CACHE_TTL_SECONDS = 6 * 3600
+REFERENCE_CACHE_MAX_ENTRIES = 512
+_reference_cache: Dict[tuple, Tuple[float, list, str]] = {}
+
+
+async def get_cached_reference(key: tuple, ttl: int, load: Callable[[], Awaitable[list]]) -> Tuple[list, str]:
+    """Return (serialized rows, ETag) for a reference query, loading it on a miss."""
+    entry = _reference_cache.get(key)
+    if entry is not None and entry[0] >= time.monotonic():
+        return entry[1], entry[2]
+
+    data = await load()
+    etag = f'"{hashlib.blake2b(orjson.dumps(data), digest_size=16).hexdigest()}"'
+    if len(_reference_cache) >= REFERENCE_CACHE_MAX_ENTRIES:
+        _reference_cache.clear()
+    _reference_cache[key] = (time.monotonic() + ttl, data, etag)
+    return data, etag
 
 
 # ============================================================================
@@ -192,21 +402,25 @@ async def root():
         "endpoints": {
             "resources": "/api/v2/resources",
             "resource_detail": "/api/v2/resources/{id}",
+            "resource_export": "/api/v2/resources/export",
             "species": "/api/v2/species",
             "tags": "/api/v2/tags",
             "bioc_releases": "/api/v2/bioc-releases",
-            "health": "/health"
+            "health": "/health",
+            "health_deep": "/health/deep"
         }
     }
 
 
-@app.get("/api/v2/resources", response_model=ResourceListResponse)
+@app.get("/api/v2/resources", responses={200: {"model": ResourceListResponse}})
 async def list_resources(
-    db: AsyncSession = Depends(get_db),
+    request: Request,
+    response: Response,
 
     # Pagination
     limit: int = Query(default=100, ge=1, le=1000, description="Maximum results per page"),
     offset: int = Query(default=0, ge=0, description="Number of results to skip"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from meta.next_cursor; seeks past the previous page instead of using offset"),
 
     # Sorting
     sort: Optional[str] = Query(
@@ -256,7 +470,11 @@ async def list_resources(
     # Include nested data
     include_tags: bool = Query(False, description="Include tags in response"),
     include_files: bool = Query(False, description="Include file information"),
+    include_file_counts: bool = Query(False, description="Include file counts without loading the files"),
     include_bioc_versions: bool = Query(False, description="Include Bioconductor version associations"),
+
+    # Total count
+    include_total: bool = Query(False, description="Compute meta.total (an extra COUNT query; ignored with cursor)"),
 ):
     """
     List resources with comprehensive filtering, sorting, and pagination.
@@ -280,33 +498,55 @@ async def list_resources(
 
     - Page 1: `?limit=50&offset=0`
     - Page 2: `?limit=50&offset=50`
+    - Deep pages: with the default `sort=-created_at`, pass `meta.next_cursor`
+      back as `?cursor=...` to seek directly to the next page
+    - `meta.total` is only included with `?include_total=true`
+
+    ## Caching
+
+    Requests with `include_total=true` (or `If-None-Match`) get an `ETag`
+    derived from the filters, the matching row count, their latest
+    `updated_at` and the latest change to tags, files, Bioconductor version
+    links and embedded providers, recipes and maintainers; send it back as
+    `If-None-Match` to get a `304 Not Modified`. Other requests skip the
+    count query entirely.
     """
 
-    # Build base query with eager loading for nested entities
-    query = select(Resource).options(
-        joinedload(Resource.hub),
-        joinedload(Resource.species),
-        joinedload(Resource.genome),
-        joinedload(Resource.data_provider),
-        joinedload(Resource.recipe),
-        joinedload(Resource.maintainer),
-        joinedload(Resource.status),
-    )
+    # Build base query; nested entities are eager-loaded once joins are known
+    query = select(Resource)
 
-    # Optionally load collections
+    # Optionally load collections; unrequested ones are never loaded so
+    # the schema can read the instance directly
     if include_tags:
         query = query.options(
             selectinload(Resource.tags).joinedload(ResourceTag.tag_obj)
         )
+    else:
+        query = query.options(noload(Resource.tags))
     if include_files:
         query = query.options(
             selectinload(Resource.resource_files),
             selectinload(Resource.source_files)
         )
+    else:
+        query = query.options(noload(Resource.resource_files), noload(Resource.source_files))
+    if include_file_counts:
+        query = query.options(
+            with_expression(
+                Resource.num_resource_files,
+                select(func.count(ResourceFile.id)).where(ResourceFile.resource_id == Resource.id).scalar_subquery(),
+            ),
+            with_expression(
+                Resource.num_source_files,
+                select(func.count(SourceFile.id)).where(SourceFile.resource_id == Resource.id).scalar_subquery(),
+            ),
+        )
     if include_bioc_versions:
         query = query.options(
             selectinload(Resource.bioc_versions).joinedload(ResourceBiocVersion.bioc_release)
         )
+    else:
+        query = query.options(noload(Resource.bioc_versions))
 
     # Apply filters
     conditions = build_resource_filters(
@@ -331,117 +571,248 @@ async def list_resources(
         is_current=is_current,
     )
 
-    # Join for species/genome/provider name filters
+    # Related-table name filters; each relationship is joined at most once
+    joins = []
+    if species_name or taxonomy_id:
+        joins.append(Resource.species)
     if species_name:
-        query = query.join(Resource.species).filter(Species.scientific_name.ilike(f"%{species_name}%"))
+        conditions.append(Species.scientific_name.ilike(f"%{species_name}%"))
     if taxonomy_id:
-        query = query.join(Resource.species).filter(Species.taxonomy_id == taxonomy_id)
+        conditions.append(Species.taxonomy_id == taxonomy_id)
     if genome_build:
-        query = query.join(Resource.genome).filter(Genome.genome_build.ilike(f"%{genome_build}%"))
+        joins.append(Resource.genome)
+        conditions.append(Genome.genome_build.ilike(f"%{genome_build}%"))
     if provider_name:
-        query = query.join(Resource.data_provider).filter(DataProvider.name.ilike(f"%{provider_name}%"))
+        joins.append(Resource.data_provider)
+        conditions.append(DataProvider.name.ilike(f"%{provider_name}%"))
     if hub_code:
-        query = query.join(Resource.hub).filter(Hub.code == hub_code.upper())
+        joins.append(Resource.hub)
+        conditions.append(Hub.code == hub_code.upper())
 
-    # Tag filtering (requires subquery)
+    # Tag and Bioc version facets each yield candidate resource ids; they are
+    # intersected in one CTE and joined to resources once
+    candidate_sets = []
     if tags:
-        tag_list = [t.strip() for t in tags.split(",") if t.strip()]
-        # Must have ALL tags (AND logic)
-        for tag_name in tag_list:
-            tag_subquery = select(ResourceTag.resource_id).join(Tag).filter(Tag.tag == tag_name)
-            query = query.filter(Resource.id.in_(tag_subquery))
+        tag_list = {t.strip() for t in tags.split(",") if t.strip()}
+        # Must have ALL tags (AND logic): one grouped pass over resource_tags
+        tag_ids = select(Tag.id).where(Tag.tag.in_(tag_list))
+        candidate_sets.append(
+            select(ResourceTag.resource_id)
+            .where(ResourceTag.tag_id.in_(tag_ids))
+            .group_by(ResourceTag.resource_id)
+            .having(func.count(ResourceTag.tag_id.distinct()) == len(tag_list))
+        )
 
     if tags_any:
         tag_list = [t.strip() for t in tags_any.split(",") if t.strip()]
         # Must have ANY tag (OR logic)
-        tag_subquery = select(ResourceTag.resource_id).join(Tag).filter(Tag.tag.in_(tag_list))
-        query = query.filter(Resource.id.in_(tag_subquery))
+        tag_ids = select(Tag.id).where(Tag.tag.in_(tag_list))
+        candidate_sets.append(
+            select(ResourceTag.resource_id).where(ResourceTag.tag_id.in_(tag_ids)).distinct()
+        )
 
-    # Bioc version filtering
+    # Bioc version filtering; versions missing from the cached mapping
+    # (e.g. added since the last refresh) fall back to the join
     if bioc_version:
-        bioc_subquery = select(ResourceBiocVersion.resource_id).join(BiocRelease).filter(
-            BiocRelease.version == bioc_version
-        )
-        query = query.filter(Resource.id.in_(bioc_subquery))
+        bioc_release_id = BIOC_VERSION_TO_ID.get(bioc_version)
+        if bioc_release_id is not None:
+            candidate_sets.append(
+                select(ResourceBiocVersion.resource_id).where(
+                    ResourceBiocVersion.bioc_release_id == bioc_release_id
+                )
+            )
+        else:
+            candidate_sets.append(
+                select(ResourceBiocVersion.resource_id).join(BiocRelease).filter(
+                    BiocRelease.version == bioc_version
+                )
+            )
 
-    # Apply all conditions
+    candidates = None
+    if candidate_sets:
+        candidate_ids = candidate_sets[0] if len(candidate_sets) == 1 else intersect(*candidate_sets)
+        candidates = candidate_ids.cte("candidate_resources").prefix_with("MATERIALIZED", dialect="postgresql")
+
+    # Apply joins and conditions; joined relations are populated from the
+    # filter join itself rather than a second eager-load join
+    joined_keys = {relationship.key for relationship in joins}
+    query = query.options(*(
+        contains_eager(relationship) if relationship.key in joined_keys else joinedload(relationship)
+        for relationship in TO_ONE_RELATIONSHIPS
+    ))
+    for relationship in joins:
+        query = query.join(relationship)
+    if candidates is not None:
+        query = query.join(candidates, candidates.c.resource_id == Resource.id)
     if conditions:
         query = query.filter(and_(*conditions))
 
-    # Count total (before pagination)
-    count_query = select(func.count()).select_from(
-        query.subquery()
+    # Count and latest update of the filtered set, without the eager-load
+    # joins; only needed for meta.total or to answer a conditional GET
+    conditional = "if-none-match" in request.headers
+    want_total = include_total and cursor is None
+    count_key = (
+        hub_id, hub_code, species_id, species_name, taxonomy_id, genome_id,
+        genome_build, provider_id, provider_name, recipe_id, maintainer_id,
+        status_id, is_deleted, is_current, title_contains, description_contains,
+        coordinate_1_based, created_after, created_before, tags, tags_any, bioc_version,
     )
-    total = await db.scalar(count_query) or 0
+    context = {
+        "include_tags": include_tags,
+        "include_files": include_files,
+        "include_bioc_versions": include_bioc_versions,
+        "reference_cache": {},
+    }
 
-    # Apply sorting
-    sort_fields = parse_sort_param(sort)
-    query = apply_sorting(query, sort_fields)
+    # One session serves the count and the page, and the streamed response
+    # owns it; the request never holds a second pooled connection
+    session = async_session_maker()
+    try:
+        total = None
+        if conditional or want_total:
+            stats = _get_cached_count(count_key)
+            if stats is None:
+                count_query = select(
+                    func.count(Resource.id), func.max(Resource.updated_at), *EMBEDDED_VERSION_QUERIES
+                )
+                for relationship in joins:
+                    count_query = count_query.join(relationship)
+                if candidates is not None:
+                    count_query = count_query.join(candidates, candidates.c.resource_id == Resource.id)
+                if conditions:
+                    count_query = count_query.where(and_(*conditions))
+                stats = tuple((await session.execute(count_query)).one())
+                _set_cached_count(count_key, stats)
+            check_etag(request, response, make_etag(request, *stats), LIST_CACHE_CONTROL)
+            total = stats[0] if want_total else None
+
+        # Apply sorting
+        sort_fields = parse_sort_param(sort)
+        keyset = sort_fields == KEYSET_SORT
+        if cursor is not None:
+            if not keyset:
+                raise HTTPException(status_code=400, detail="cursor pagination requires sort=-created_at")
+            cursor_created_at, cursor_id = decode_cursor(cursor)
+            query = query.filter(
+                tuple_(Resource.created_at, Resource.id) < tuple_(cursor_created_at, cursor_id)
+            )
+        query = apply_sorting(query, sort_fields)
+        if keyset:
+            # Tie-break on id so the cursor position is unique
+            query = query.order_by(Resource.id.desc())
+
+        # Apply pagination, fetching one extra row to detect a next page
+        if cursor is not None:
+            query = query.limit(limit + 1)
+        else:
+            query = query.limit(limit + 1).offset(offset)
+
+        # Fetch and render the first batch before any bytes are sent, so a
+        # query or validation error is still an error response, not a
+        # truncated 200
+        result = await session.stream(query.execution_options(yield_per=RESOURCE_STREAM_BATCH_SIZE))
+        partitions = result.scalars().partitions()
+        batch, has_next = _clip_batch(await anext(partitions, []), 0, limit)
+        first_items = _render_batch(batch, context)
+    except BaseException:
+        await session.close()
+        raise
+
+    async def stream_page():
+        # Later batches are fetched, validated and written
+        # RESOURCE_STREAM_BATCH_SIZE rows at a time, so peak memory no longer
+        # grows with limit; meta is written last once has_next is known
+        try:
+            yield b'{"data":[' + first_items
+            count = len(batch)
+            last_resource = batch[-1] if batch else None
+            more = bool(batch) and not has_next
+            page_full = has_next
+            session.expunge_all()
+            while more:
+                rows, page_full = _clip_batch(await anext(partitions, []), count, limit)
+                if not rows:
+                    break
+                yield b"," + _render_batch(rows, context)
+                count += len(rows)
+                last_resource = rows[-1]
+                session.expunge_all()
+                more = not page_full
+        finally:
+            await session.close()
+
+        meta = PaginationMeta(
+            total=total,
+            limit=limit,
+            offset=offset,
+            count=count,
+            has_next=page_full,
+            has_prev=offset > 0 or cursor is not None,
+            next_cursor=encode_cursor(last_resource) if keyset and page_full else None,
+        )
+        yield b'],"meta":' + meta.model_dump_json().encode() + b"}"
+
+    headers = {"Cache-Control": LIST_CACHE_CONTROL}
+    if "ETag" in response.headers:
+        headers["ETag"] = response.headers["ETag"]
+    # Also close the session if the client disconnects before streaming starts
+    return StreamingResponse(
+        stream_page(), media_type="application/json", headers=headers, background=BackgroundTask(session.close)
+    )
 
-    # Apply pagination
-    query = query.limit(limit).offset(offset)
 
-    # Execute query
-    result = await db.execute(query)
-    resources = result.unique().scalars().all()
-
-    # Build response with nested entities
-    data = []
-    for resource in resources:
-        resource_dict = {
-            "id": resource.id,
-            "hub_accession": resource.hub_accession,
-            "title": resource.title,
-            "description": resource.description,
-            "hub_id": resource.hub_id,
-            "species_id": resource.species_id,
-            "genome_id": resource.genome_id,
-            "data_provider_id": resource.data_provider_id,
-            "recipe_id": resource.recipe_id,
-            "maintainer_id": resource.maintainer_id,
-            "status_id": resource.status_id,
-            "coordinate_1_based": resource.coordinate_1_based,
-            "valid_from": resource.valid_from,
-            "valid_to": resource.valid_to,
-            "version_number": resource.version_number,
-            "created_at": resource.created_at,
-            "updated_at": resource.updated_at,
-            "deleted_at": resource.deleted_at,
-            "hub": resource.hub,
-            "species": resource.species,
-            "genome": resource.genome,
-            "data_provider": resource.data_provider,
-            "recipe": resource.recipe,
-            "maintainer": resource.maintainer,
-            "status": resource.status,
-        }
+@app.get("/api/v2/resources/export")
+async def export_resources(
+    hub_id: Optional[int] = Query(None, description="Only export resources of this hub"),
+):
+    """
+    Stream every live resource as a single `{"data": [...]}` document.
 
-        # Add optional nested collections
-        if include_tags:
-            resource_dict["tags"] = [rt.tag_obj for rt in resource.tags]
-        if include_bioc_versions:
-            resource_dict["bioc_versions"] = [rbv.bioc_release for rbv in resource.bioc_versions]
-        if include_files:
-            resource_dict["resource_files"] = resource.resource_files
-            resource_dict["source_files"] = resource.source_files
-
-        data.append(ResourceSchema(**resource_dict))
-
-    # Build pagination metadata
-    meta = PaginationMeta(
-        total=total,
-        limit=limit,
-        offset=offset,
-        count=len(data),
-        has_next=offset + limit < total,
-        has_prev=offset > 0
+    Rows are read through a server-side cursor and serialized
+    RESOURCE_EXPORT_BATCH_SIZE at a time, so memory stays flat however many
+    resources match. The export runs in one read-only REPEATABLE READ
+    transaction, so it reflects a single snapshot. Nested collections are not
+    included; use `/api/v2/resources` for filtered, paginated queries.
+    """
+    query = select(Resource).where(Resource.deleted_at.is_(None)).options(
+        *(joinedload(relationship) for relationship in TO_ONE_RELATIONSHIPS),
+        noload(Resource.tags),
+        noload(Resource.bioc_versions),
+        noload(Resource.resource_files),
+        noload(Resource.source_files),
     )
+    if hub_id is not None:
+        query = query.where(Resource.hub_id == hub_id)
+    query = query.order_by(Resource.id).execution_options(yield_per=RESOURCE_EXPORT_BATCH_SIZE)
+    context = {
+        "include_tags": False,
+        "include_files": False,
+        "include_bioc_versions": False,
+        "reference_cache": {},
+    }
 
-    return ResourceListResponse(meta=meta, data=data)
+    async def generate():
+        yield b'{"data":['
+        first = True
+        async with async_session_maker() as session:
+            await session.connection(
+                execution_options={"isolation_level": "REPEATABLE READ", "postgresql_readonly": True}
+            )
+            result = await session.stream(query)
+            async for partition in result.scalars().partitions():
+                items = _render_batch(partition, context)
+                yield items if first else b"," + items
+                first = False
+                session.expunge_all()
+        yield b"]}"
+
+    return StreamingResponse(generate(), media_type="application/json")
 
 
 @app.get("/api/v2/resources/{resource_id}", response_model=ResourceDetailResponse)
 async def get_resource(
+    request: Request,
+    response: Response,
     resource_id: int = Path(..., description="Resource ID"),
     db: AsyncSession = Depends(get_db),
 ):
@@ -456,13 +827,7 @@ async def get_resource(
     - All source files
     """
     query = select(Resource).where(Resource.id == resource_id).options(
-        joinedload(Resource.hub),
-        joinedload(Resource.species),
-        joinedload(Resource.genome),
-        joinedload(Resource.data_provider),
-        joinedload(Resource.recipe),
-        joinedload(Resource.maintainer),
-        joinedload(Resource.status),
+        *(joinedload(relationship) for relationship in TO_ONE_RELATIONSHIPS),
         selectinload(Resource.tags).joinedload(ResourceTag.tag_obj),
         selectinload(Resource.bioc_versions).joinedload(ResourceBiocVersion.bioc_release),
         selectinload(Resource.resource_files),
@@ -475,40 +840,22 @@ async def get_resource(
     if not resource:
         raise HTTPException(status_code=404, detail=f"Resource {resource_id} not found")
 
-    # Build full response
-    resource_dict = {
-        "id": resource.id,
-        "hub_accession": resource.hub_accession,
-        "title": resource.title,
-        "description": resource.description,
-        "hub_id": resource.hub_id,
-        "species_id": resource.species_id,
-        "genome_id": resource.genome_id,
-        "data_provider_id": resource.data_provider_id,
-        "recipe_id": resource.recipe_id,
-        "maintainer_id": resource.maintainer_id,
-        "status_id": resource.status_id,
-        "coordinate_1_based": resource.coordinate_1_based,
-        "valid_from": resource.valid_from,
-        "valid_to": resource.valid_to,
-        "version_number": resource.version_number,
-        "created_at": resource.created_at,
-        "updated_at": resource.updated_at,
-        "deleted_at": resource.deleted_at,
-        "hub": resource.hub,
-        "species": resource.species,
-        "genome": resource.genome,
-        "data_provider": resource.data_provider,
-        "recipe": resource.recipe,
-        "maintainer": resource.maintainer,
-        "status": resource.status,
-        "tags": [rt.tag_obj for rt in resource.tags],
-        "bioc_versions": [rbv.bioc_release for rbv in resource.bioc_versions],
-        "resource_files": resource.resource_files,
-        "source_files": resource.source_files,
-    }
+    # Version the ETag from the loaded graph: the row, and the count and
+    # latest change of its links, so adding or removing one changes it too
+    link_times = [
+        *(link.added_at for link in resource.tags),
+        *(link.added_at for link in resource.bioc_versions),
+        *(f.updated_at for f in resource.resource_files),
+        *(f.created_at for f in resource.source_files),
+    ]
+    check_etag(
+        request, response,
+        make_etag(request, resource_id, resource.updated_at, len(link_times), max(link_times, default=None)),
+        LIST_CACHE_CONTROL,
+    )
 
-    return ResourceDetailResponse(data=ResourceDetailSchema(**resource_dict))
+    # data is already validated; construct the envelope without re-checking it
+    return ResourceDetailResponse.model_construct(data=ResourceDetailSchema.model_validate(resource))
 
 
 # ============================================================================
@@ -517,32 +864,43 @@ async def get_resource(
 
 @app.get("/api/v2/species", response_model=List[SpeciesSchema])
 async def list_species(
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     limit: int = Query(default=100, ge=1, le=1000),
     offset: int = Query(default=0, ge=0),
     search: Optional[str] = Query(None, description="Search in scientific or common name"),
 ):
     """List all species with optional search."""
-    query = select(Species)
-
-    if search:
-        query = query.filter(
-            or_(
-                Species.scientific_name.ilike(f"%{search}%"),
-                Species.common_name.ilike(f"%{search}%")
+    async def load():
+        query = select(Species)
+
+        if search:
+            query = query.filter(
+                or_(
+                    Species.scientific_name.ilike(f"%{search}%"),
+                    Species.common_name.ilike(f"%{search}%")
+                )
             )
-        )
 
-    query = query.order_by(Species.scientific_name).limit(limit).offset(offset)
+        query = query.order_by(Species.scientific_name).limit(limit).offset(offset)
 
-    result = await db.execute(query)
-    species = result.scalars().all()
+        result = await db.execute(query)
+        species = result.scalars().all()
 
-    return [SpeciesSchema.model_validate(s) for s in species]
+        return [SpeciesSchema.model_validate(s).model_dump(mode="json") for s in species]
+
+    data, etag = await get_cached_reference(
+        ("species", search, limit, offset), REFERENCE_CACHE_TTL_SECONDS, load
+    )
+    check_etag(request, response, etag, LIST_CACHE_CONTROL)
+    return data
 
 
 @app.get("/api/v2/tags", response_model=List[TagSchema])
 async def list_tags(
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     limit: int = Query(default=100, ge=1, le=1000),
     offset: int = Query(default=0, ge=0),
@@ -550,39 +908,110 @@ async def list_tags(
     category: Optional[str] = Query(None, description="Filter by category"),
 ):
     """List all tags with optional search and filtering."""
-    query = select(Tag)
+    async def load():
+        query = select(Tag)
 
-    if search:
-        query = query.filter(Tag.tag.ilike(f"%{search}%"))
-    if category:
-        query = query.filter(Tag.category == category)
+        if search:
+            query = query.filter(Tag.tag.ilike(f"%{search}%"))
+        if category:
+            query = query.filter(Tag.category == category)
 
-    query = query.order_by(Tag.tag).limit(limit).offset(offset)
+        query = query.order_by(Tag.tag).limit(limit).offset(offset)
 
-    result = await db.execute(query)
-    tags = result.scalars().all()
+        result = await db.execute(query)
+        tags = result.scalars().all()
 
-    return [TagSchema.model_validate(t) for t in tags]
+        return [TagSchema.model_validate(t).model_dump(mode="json") for t in tags]
+
+    data, etag = await get_cached_reference(
+        ("tags", search, category, limit, offset), REFERENCE_CACHE_TTL_SECONDS, load
+    )
+    check_etag(request, response, etag, LIST_CACHE_CONTROL)
+    return data
 
 
 @app.get("/api/v2/bioc-releases", response_model=List[BiocReleaseSchema])
 async def list_bioc_releases(
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
 ):
     """List all Bioconductor releases."""
-    query = select(BiocRelease).order_by(BiocRelease.version.desc())
+    async def load():
+        query = select(BiocRelease).order_by(BiocRelease.version.desc())
+
+        result = await db.execute(query)
+        releases = result.scalars().all()
+
+        return [BiocReleaseSchema.model_validate(r).model_dump(mode="json") for r in releases]
+
+    data, etag = await get_cached_reference(("bioc_releases",), RELEASE_CACHE_TTL_SECONDS, load)
+    check_etag(request, response, etag, STATIC_CACHE_CONTROL)
+    return data
+
+
+# Admin endpoints are for operators: set HUBS_ADMIN_TOKEN and send it as
+# X-Admin-Token. Without a configured token they are disabled.
+ADMIN_TOKEN = os.getenv("HUBS_ADMIN_TOKEN")
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """Reject requests without the configured admin token."""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if x_admin_token is None or not hmac.compare_digest(x_admin_token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
 
-    result = await db.execute(query)
-    releases = result.scalars().all()
 
-    return [BiocReleaseSchema.model_validate(r) for r in releases]
+@app.post("/admin/cache/flush", dependencies=[Depends(require_admin)])
+async def flush_cache():
+    """
+    Drop this worker's cached reference data and totals.
+
+    Caches are per process, so with several workers only the one handling
+    this request is flushed; the others serve their entries until the TTL
+    expires (30 s for totals, 5 min for species/tags, 6 h for releases).
+    """
+    _reference_cache.clear()
+    _count_cache.clear()
+    await refresh_bioc_versions()
+    return {"status": "flushed"}
+
+
+# Liveness probes poll /health every few seconds; reuse a recent success
+HEALTH_CACHE_TTL_SECONDS = 2.0
+_last_healthy_at = 0.0
 
 
 @app.get("/health")
 async def health_check(db: AsyncSession = Depends(get_db)):
-    """Health check endpoint - verifies database connectivity."""
+    """Health check endpoint - verifies database connectivity (cached briefly)."""
+    if time.monotonic() - _last_healthy_at < HEALTH_CACHE_TTL_SECONDS:
+        return {"status": "healthy", "database": "connected"}
+    return await deep_health_check(db)
+
+
+@app.get("/health/deep")
+async def deep_health_check(db: AsyncSession = Depends(get_db)):
+    """Health check endpoint - always probes the database."""
+    global _last_healthy_at
     try:
         await db.execute(select(1))
-        return {"status": "healthy", "database": "connected"}
     except Exception as e:
+        _last_healthy_at = 0.0
         raise HTTPException(status_code=503, detail=f"Database error: {str(e)}")
+    _last_healthy_at = time.monotonic()
+    return {"status": "healthy", "database": "connected"}
+
+
+@app.get("/health/pool", dependencies=[Depends(require_admin)])
+async def pool_status():
+    """Connection pool usage for this worker (no database round-trip; admin token required)."""
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "max_overflow": API_ENGINE_OPTIONS["max_overflow"],
+    }
@@ -1,6 +1,18 @@
 import asyncio
 import click
-from . import mirror
+
+
+def _run_db(coro):
+    """Run a db_utils coroutine, disposing its shared engines before the loop closes."""
+    from . import db_utils
+
+    async def runner():
+        try:
+            return await coro
+        finally:
+            await db_utils.dispose_engines()
+
+    return asyncio.run(runner())
 
 
 @click.group()
@@ -10,14 +22,19 @@ def cli():
 
 
 @cli.command(name='pg-dump-schema')
-def pg_dump_schema():
+@click.option("--output", default="postgres_schema.csv", help="CSV file to write the schema to")
+def pg_dump_schema(output: str):
     """Dump the PostgreSQL schema from the attached Postgres via DuckDB."""
-    mirror.dump_postgresql_schema_from_duckdb()
+    from . import mirror
+
+    mirror.dump_postgresql_schema_from_duckdb(output)
 
 
 @cli.command(name="mirror")
 def mirror_command():
     """Mirror the AnnotationHub SQLite to Postgres."""
+    from . import mirror
+
     mirror.main()
 
 
@@ -25,8 +42,16 @@ def mirror_command():
 @click.option("--host", default="0.0.0.0", help="Host to bind to")
 @click.option("--port", default=8000, type=int, help="Port to bind to")
 @click.option("--reload", is_flag=True, help="Enable auto-reload for development")
-def serve(host: str, port: int, reload: bool):
+@click.option(
+    "--workers",
+    default=1,
+    type=int,
+    envvar="WEB_CONCURRENCY",
+    help="Worker processes; use $(nproc) in production (ignored with --reload)",
+)
+def serve(host: str, port: int, reload: bool, workers: int):
     """Start the FastAPI REST API server (v2 with normalized schema)."""
+    import importlib.util
     import uvicorn
     click.echo(f"Starting API server on {host}:{port}")
     click.echo(f"API documentation: http://{host}:{port}/docs")
@@ -35,6 +60,10 @@ def serve(host: str, port: int, reload: bool):
         host=host,
         port=port,
         reload=reload,
+        workers=None if reload else workers,
+        # uvicorn[standard] ships httptools everywhere and uvloop where it builds
+        loop="uvloop" if importlib.util.find_spec("uvloop") else "asyncio",
+        http="httptools",
         access_log=False,
     )
 
@@ -75,7 +104,7 @@ def create_schema(database_url: str, drop_existing: bool):
         click.echo(click.style("⚠️  WARNING: Dropping all existing tables!", fg="yellow", bold=True))
 
     try:
-        asyncio.run(db_utils.create_schema(database_url, drop_existing=drop_existing))
+        _run_db(db_utils.create_schema(database_url, drop_existing=drop_existing))
         click.echo(click.style("✓ Schema created successfully!", fg="green"))
     except Exception as e:
         click.echo(click.style(f"✗ Error creating schema: {e}", fg="red"), err=True)
@@ -96,7 +125,7 @@ def seed_data(database_url: str):
     click.echo(f"Seeding initial data in database: {database_url}")
 
     try:
-        asyncio.run(db_utils.seed_initial_data(database_url))
+        _run_db(db_utils.seed_initial_data(database_url))
         click.echo(click.style("✓ Initial data seeded successfully!", fg="green"))
     except Exception as e:
         click.echo(click.style(f"✗ Error seeding data: {e}", fg="red"), err=True)
@@ -110,14 +139,15 @@ def seed_data(database_url: str):
     required=True,
     help="PostgreSQL connection string (or set POSTGRES_URI env var)"
 )
-def show_stats(database_url: str):
+@click.option("--exact", is_flag=True, help="Count every row instead of using planner estimates")
+def show_stats(database_url: str, exact: bool):
     """Show database statistics (record counts per table)."""
     from . import db_utils
 
     click.echo(f"Fetching statistics from database: {database_url}\n")
 
     try:
-        stats = asyncio.run(db_utils.get_database_stats(database_url))
+        stats = _run_db(db_utils.get_database_stats(database_url, exact=exact))
 
         # Calculate column width for alignment
         max_table_len = max(len(table) for table in stats.keys())
@@ -135,7 +165,7 @@ def show_stats(database_url: str):
             "Files": ["resource_files", "source_files"],
             "Classification": ["tags", "resource_tags"],
             "Bioconductor": ["resource_bioc_versions"],
-            "Audit": ["audit_log"],
+            "Audit": ["audit_tables", "audit_log"],
         }
 
         for category, tables in categories.items():
@@ -170,7 +200,7 @@ def verify_schema(database_url: str):
     click.echo(f"Verifying schema in database: {database_url}\n")
 
     try:
-        is_valid = asyncio.run(db_utils.verify_schema(database_url))
+        is_valid = _run_db(db_utils.verify_schema(database_url))
 
         if is_valid:
             click.echo(click.style("✓ Schema verification passed!", fg="green", bold=True))
@@ -207,20 +237,26 @@ def init_database(database_url: str, drop_existing: bool):
         if not click.confirm("Are you sure you want to continue?"):
             raise click.Abort()
 
-    try:
+    async def _init_all():
         # Step 1: Create schema
         click.echo("\n[1/3] Creating schema...")
-        asyncio.run(db_utils.create_schema(database_url, drop_existing=drop_existing))
+        await db_utils.create_schema(database_url, drop_existing=drop_existing)
         click.echo(click.style("  ✓ Schema created", fg="green"))
 
         # Step 2: Seed data
         click.echo("\n[2/3] Seeding initial data...")
-        asyncio.run(db_utils.seed_initial_data(database_url))
+        await db_utils.seed_initial_data(database_url)
         click.echo(click.style("  ✓ Data seeded", fg="green"))
 
         # Step 3: Verify
         click.echo("\n[3/3] Verifying schema...")
-        is_valid = asyncio.run(db_utils.verify_schema(database_url))
+        if not await db_utils.verify_schema(database_url):
+            return False, {}
+        return True, await db_utils.get_database_stats(database_url, exact=True)
+
+    try:
+        # All steps share one event loop
+        is_valid, stats = _run_db(_init_all())
         if is_valid:
             click.echo(click.style("  ✓ Verification passed", fg="green"))
         else:
@@ -232,7 +268,6 @@ def init_database(database_url: str, drop_existing: bool):
         click.echo(click.style("Database initialized successfully! 🎉", fg="green", bold=True))
         click.echo("=" * 60 + "\n")
 
-        stats = asyncio.run(db_utils.get_database_stats(database_url))
         click.echo("Initial record counts:")
         for table, count in sorted(stats.items()):
             if count > 0:
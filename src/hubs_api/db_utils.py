@@ -4,9 +4,14 @@ Database utilities for schema creation, seeding, and migrations.
 Uses async/await with asyncpg for PostgreSQL operations.
 """
 
+import asyncio
+import os
 from datetime import date
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, Tuple
 from sqlalchemy import text, select
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.engine import make_url
 from .models import (
     Base,
     Hub,
@@ -14,17 +19,203 @@ from .models import (
     BiocRelease,
     Organization,
     User,
+    AuditTable,
 )
 
-
+if TYPE_CHECKING:
+    # The async extension (and greenlet) is imported on first engine use, so
+    # importing this module for API_ENGINE_OPTIONS or URL helpers stays cheap
+    from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+# Connection pool settings shared by the long-running API servers
+API_ENGINE_OPTIONS = {
+    # Statement logging is synchronous I/O on the event loop; opt in for debugging only
+    "echo": os.getenv("SQL_ECHO", "0") == "1",
+    # Requests hold a connection only for their own session; a small pool with
+    # limited overflow is enough per worker and keeps total connections bounded
+    "pool_size": int(os.getenv("DB_POOL_SIZE", "15")),
+    "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "5")),
+    "pool_pre_ping": True,
+    "pool_recycle": 1800,
+    # Room for every filter/join/sort combination of the v2 list query, so
+    # structurally identical statements skip SQL compilation
+    "query_cache_size": 1200,
+    "connect_args": {
+        "server_settings": {"jit": "off", "application_name": "hubs_api"},
+        "statement_cache_size": 1024,
+        "prepared_statement_cache_size": 512,
+    },
+}
+
+
+@lru_cache(maxsize=16)
 def _convert_to_async_url(database_url: str) -> str:
-    """Convert postgresql:// URL to postgresql+asyncpg:// for async operations."""
-    if database_url.startswith("postgresql://"):
-        return database_url.replace("postgresql://", "postgresql+asyncpg://", 1)
-    elif database_url.startswith("postgresql+asyncpg://"):
-        return database_url
-    else:
-        raise ValueError(f"Unsupported database URL scheme: {database_url}")
+    """Convert any PostgreSQL URL (postgres://, postgresql+psycopg://, ...) to postgresql+asyncpg://."""
+    url = make_url(database_url)
+    if url.get_backend_name() not in ("postgres", "postgresql"):
+        raise ValueError(f"Unsupported database URL scheme: {url.drivername}")
+    return url.set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+
+
+# Reference rows inserted by seed_initial_data, built once at import
+SEED_HUBS = (
+    dict(id=1, name="AnnotationHub", code="AH", description="Annotation resources for genomic data"),
+    dict(id=2, name="ExperimentHub", code="EH", description="Experimental data and workflows"),
+)
+
+SEED_STATUSES = (
+    dict(id=1, status="Public", is_public=True, sort_order=1),
+    dict(id=2, status="Unreviewed", is_public=False, sort_order=2),
+    dict(id=3, status="Private", is_public=False, sort_order=3),
+    dict(id=10, status="Removed from original web location", is_public=False, sort_order=10),
+    dict(id=11, status="Removed by author request", is_public=False, sort_order=11),
+    dict(id=12, status="Moved from AnnotationHub to ExperimentHub", is_public=False, sort_order=12),
+    dict(id=13, status="Replaced by more current version", is_public=False, sort_order=13),
+    dict(id=14, status="Invalid metadata", is_public=False, sort_order=14),
+    dict(id=15, status="Did not make review deadline for biocversion", is_public=False, sort_order=15),
+    dict(id=99, status="Defunct", is_public=False, sort_order=99),
+)
+
+SEED_RELEASES = (
+    dict(version="3.18", release_date=date(2023, 10, 25), is_current=False, r_version_min="4.3"),
+    dict(version="3.19", release_date=date(2024, 5, 1), is_current=False, r_version_min="4.4"),
+    dict(version="3.20", release_date=date(2024, 10, 30), is_current=True, r_version_min="4.4"),
+)
+
+SEED_ORGANIZATION = dict(name="Bioconductor", short_name="bioconductor", website="https://bioconductor.org")
+
+SEED_SYSTEM_USER = dict(email="system@bioconductor.org", full_name="Bioconductor System", role="admin")
+
+# Tables whose changes are recorded in audit_log; ids are assigned on insert
+AUDITED_TABLES = tuple(sorted(
+    table.name for table in Base.metadata.sorted_tables
+    if table.name not in ("audit_log", "audit_tables", "schema_info")
+))
+
+
+# Tables reported by get_database_stats
+STATS_TABLES = (
+    "organizations",
+    "users",
+    "species",
+    "genomes",
+    "data_providers",
+    "recipes",
+    "hubs",
+    "resource_statuses",
+    "resources",
+    "storage_locations",
+    "resource_files",
+    "source_files",
+    "tags",
+    "resource_tags",
+    "bioc_releases",
+    "resource_bioc_versions",
+    "audit_tables",
+    "audit_log",
+)
+
+_STATS_SQL = text(
+    "SELECT " + ", ".join(f"(SELECT COUNT(*) FROM {table}) AS {table}" for table in STATS_TABLES)
+)
+
+# Partitioned parents (audit_log) keep no statistics of their own, so their
+# estimate is the sum over leaf partitions; -1 (unanalyzed) if any leaf is
+_ESTIMATED_STATS_SQL = text(
+    "SELECT c.relname, CASE WHEN c.relkind = 'p' THEN ("
+    "SELECT CASE WHEN bool_or(p.reltuples < 0) THEN -1 ELSE COALESCE(sum(p.reltuples), 0) END "
+    "FROM pg_partition_tree(c.oid) t JOIN pg_class p ON p.oid = t.relid WHERE t.isleaf"
+    ") ELSE c.reltuples END::bigint FROM pg_class c "
+    "WHERE c.relname = ANY(:names) AND c.relkind IN ('r', 'p') "
+    "AND c.relnamespace = current_schema()::regnamespace"
+)
+
+
+_EXISTING_TABLES_SQL = text("SELECT tablename FROM pg_tables WHERE schemaname = current_schema()")
+
+# audit_log is range-partitioned on performed_at; the catch-all partition keeps
+# inserts working until dated partitions (e.g. monthly, managed by pg_partman)
+# are attached. Storage parameters live on partitions, not the parent: audit
+# rows are insert-only, so pages are packed full and vacuum/analyze follow
+# inserts closely.
+AUDIT_PARTITION_STORAGE = (
+    "fillfactor = 100, toast_tuple_target = 256, "
+    "autovacuum_vacuum_insert_scale_factor = 0.02, autovacuum_analyze_scale_factor = 0.02"
+)
+
+_AUDIT_DEFAULT_PARTITION_SQL = text(
+    "CREATE TABLE IF NOT EXISTS audit_log_default PARTITION OF audit_log DEFAULT "
+    f"WITH ({AUDIT_PARTITION_STORAGE})"
+)
+
+# IF NOT EXISTS skips WITH on an existing partition; apply the settings every time
+_AUDIT_DEFAULT_STORAGE_SQL = text(f"ALTER TABLE audit_log_default SET ({AUDIT_PARTITION_STORAGE})")
+
+# Databases initialised before audit_log was partitioned keep it as a plain
+# table (create_all skips existing tables); partition DDL only applies to 'p'
+_AUDIT_PARTITIONED_SQL = text("SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass('audit_log')")
+
+# Audit rows are never updated; reject UPDATE outright rather than silently
+# ignoring it. Retention drops whole partitions, so DELETE stays allowed.
+_AUDIT_APPEND_ONLY_SQL = (
+    text(
+        "CREATE OR REPLACE FUNCTION audit_log_reject_update() RETURNS trigger "
+        "LANGUAGE plpgsql AS $$ BEGIN RAISE EXCEPTION 'audit_log is append-only'; END $$"
+    ),
+    text(
+        "CREATE OR REPLACE TRIGGER audit_log_append_only BEFORE UPDATE ON audit_log "
+        "FOR EACH STATEMENT EXECUTE FUNCTION audit_log_reject_update()"
+    ),
+)
+
+# Core tables that verify_schema requires
+VERIFY_TABLES = ("hubs", "resource_statuses", "bioc_releases", "users", "organizations")
+
+_VERIFY_SQL = text(
+    "SELECT COUNT(*) FROM information_schema.tables "
+    "WHERE table_schema = current_schema() AND table_name = ANY(:names)"
+)
+
+
+# Engines reused across helper calls, keyed by (url, echo). asyncpg
+# connections are bound to the event loop that opened them, so an engine is
+# only reused within the loop that created it.
+_engine_cache: Dict[Tuple[str, bool], Tuple[asyncio.AbstractEventLoop, "AsyncEngine"]] = {}
+
+
+def _get_engine(database_url: str, echo: bool = False) -> "AsyncEngine":
+    """Return the shared async engine for a database URL, creating it on first use."""
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    async_url = _convert_to_async_url(database_url)
+    loop = asyncio.get_running_loop()
+    cached = _engine_cache.get((async_url, echo))
+    if cached is not None and cached[0] is loop:
+        return cached[1]
+    engine = create_async_engine(
+        async_url,
+        echo=echo,
+        pool_pre_ping=True,
+        pool_size=10,
+        # Keep repeated probes and counts prepared on the server, and skip
+        # JIT compilation for these tiny queries
+        connect_args={
+            "server_settings": {"jit": "off", "application_name": "hubs_api"},
+            "statement_cache_size": 500,
+            "prepared_statement_cache_size": 500,
+        },
+    )
+    _engine_cache[(async_url, echo)] = (loop, engine)
+    return engine
+
+
+async def dispose_engines() -> None:
+    """Dispose every cached engine; call once before the event loop shuts down."""
+    cached = list(_engine_cache.values())
+    _engine_cache.clear()
+    for _, engine in cached:
+        await engine.dispose()
 
 
 async def create_schema(database_url: str, drop_existing: bool = False, echo: bool = False) -> None:
@@ -36,141 +227,145 @@ async def create_schema(database_url: str, drop_existing: bool = False, echo: bo
         drop_existing: If True, drop all existing tables first
         echo: If True, log all SQL statements
     """
-    async_url = _convert_to_async_url(database_url)
-    engine = create_async_engine(async_url, echo=echo)
+    engine = _get_engine(database_url, echo=echo)
 
     async with engine.begin() as conn:
         if drop_existing:
             await conn.run_sync(Base.metadata.drop_all)
-        await conn.run_sync(Base.metadata.create_all)
+        # Trigram GIN indexes back the case-insensitive substring filters
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        # One catalog query instead of a per-table existence probe
+        existing = set()
+        if not drop_existing:
+            existing = set((await conn.execute(_EXISTING_TABLES_SQL)).scalars())
+        missing = [table for table in Base.metadata.sorted_tables if table.name not in existing]
+        if missing:
+            await conn.run_sync(Base.metadata.create_all, tables=missing, checkfirst=False)
+        if await conn.scalar(_AUDIT_PARTITIONED_SQL):
+            await conn.execute(_AUDIT_DEFAULT_PARTITION_SQL)
+            await conn.execute(_AUDIT_DEFAULT_STORAGE_SQL)
+        for statement in _AUDIT_APPEND_ONLY_SQL:
+            await conn.execute(statement)
+
+
+async def _seed_hubs(session) -> None:
+    await session.execute(
+        pg_insert(Hub).values(list(SEED_HUBS)).on_conflict_do_nothing(index_elements=["id"])
+    )
+
+
+async def _seed_statuses(session) -> None:
+    await session.execute(
+        pg_insert(ResourceStatus).values(list(SEED_STATUSES)).on_conflict_do_nothing(index_elements=["id"])
+    )
+
+
+async def _seed_releases(session) -> None:
+    await session.execute(
+        pg_insert(BiocRelease).values(list(SEED_RELEASES)).on_conflict_do_nothing(index_elements=["version"])
+    )
+
+
+async def _seed_system_account(session) -> None:
+    # RETURNING is empty if the organization already existed
+    bioc_org_id = await session.scalar(
+        pg_insert(Organization)
+        .values(**SEED_ORGANIZATION)
+        .on_conflict_do_nothing(index_elements=["short_name"])
+        .returning(Organization.id)
+    )
+    if bioc_org_id is None:
+        bioc_org_id = await session.scalar(
+            select(Organization.id).where(Organization.short_name == SEED_ORGANIZATION["short_name"])
+        )
 
-    await engine.dispose()
+    await session.execute(
+        pg_insert(User)
+        .values(**SEED_SYSTEM_USER, organization_id=bioc_org_id)
+        .on_conflict_do_nothing(index_elements=["email"])
+    )
+
+
+async def _seed_audit_tables(session) -> None:
+    await session.execute(
+        pg_insert(AuditTable)
+        .values([dict(name=name) for name in AUDITED_TABLES])
+        .on_conflict_do_nothing(index_elements=["name"])
+    )
+
+
+# Seed steps in dependency order
+SEED_SECTIONS = (
+    ("hubs", _seed_hubs),
+    ("resource statuses", _seed_statuses),
+    ("bioc releases", _seed_releases),
+    ("system organization and user", _seed_system_account),
+    ("audit tables", _seed_audit_tables),
+)
 
 
 async def seed_initial_data(database_url: str) -> None:
     """
     Seed the database with initial reference data.
 
+    Every section runs in its own savepoint inside one transaction, so a
+    failing section is rolled back alone and the others still commit (once).
+    Inserts use ON CONFLICT DO NOTHING, so re-running is a cheap no-op.
+
     Args:
         database_url: PostgreSQL connection string (will be converted to asyncpg)
+
+    Raises:
+        RuntimeError: if any section failed (after committing the rest)
     """
-    async_url = _convert_to_async_url(database_url)
-    engine = create_async_engine(async_url)
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+    engine = _get_engine(database_url)
     async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
-    async with async_session() as session:
-        # 1. Create Hubs
-        result = await session.execute(select(Hub))
-        if not result.first():
-            hubs = [
-                Hub(id=1, name="AnnotationHub", code="AH", description="Annotation resources for genomic data"),
-                Hub(id=2, name="ExperimentHub", code="EH", description="Experimental data and workflows"),
-            ]
-            session.add_all(hubs)
-            await session.commit()
-
-        # 2. Create Resource Statuses
-        result = await session.execute(select(ResourceStatus))
-        if not result.first():
-            statuses = [
-                ResourceStatus(id=1, status="Public", is_public=True, sort_order=1),
-                ResourceStatus(id=2, status="Unreviewed", is_public=False, sort_order=2),
-                ResourceStatus(id=3, status="Private", is_public=False, sort_order=3),
-                ResourceStatus(id=10, status="Removed from original web location", is_public=False, sort_order=10),
-                ResourceStatus(id=11, status="Removed by author request", is_public=False, sort_order=11),
-                ResourceStatus(id=12, status="Moved from AnnotationHub to ExperimentHub", is_public=False, sort_order=12),
-                ResourceStatus(id=13, status="Replaced by more current version", is_public=False, sort_order=13),
-                ResourceStatus(id=14, status="Invalid metadata", is_public=False, sort_order=14),
-                ResourceStatus(id=15, status="Did not make review deadline for biocversion", is_public=False, sort_order=15),
-                ResourceStatus(id=99, status="Defunct", is_public=False, sort_order=99),
-            ]
-            session.add_all(statuses)
-            await session.commit()
-
-        # 3. Create some example Bioconductor releases
-        result = await session.execute(select(BiocRelease))
-        if not result.first():
-            releases = [
-                BiocRelease(version="3.18", release_date=date(2023, 10, 25), is_current=False, r_version_min="4.3"),
-                BiocRelease(version="3.19", release_date=date(2024, 5, 1), is_current=False, r_version_min="4.4"),
-                BiocRelease(version="3.20", release_date=date(2024, 10, 30), is_current=True, r_version_min="4.4"),
-            ]
-            session.add_all(releases)
-            await session.commit()
-
-        # 4. Create a system organization
-        result = await session.execute(select(Organization).filter_by(short_name="bioconductor"))
-        if not result.scalar_one_or_none():
-            bioc_org = Organization(
-                name="Bioconductor",
-                short_name="bioconductor",
-                website="https://bioconductor.org",
-            )
-            session.add(bioc_org)
-            await session.commit()
-
-        # 5. Create a system user for migrations
-        result = await session.execute(select(User).filter_by(email="system@bioconductor.org"))
-        if not result.scalar_one_or_none():
-            bioc_org_result = await session.execute(select(Organization).filter_by(short_name="bioconductor"))
-            bioc_org = bioc_org_result.scalar_one_or_none()
-
-            system_user = User(
-                email="system@bioconductor.org",
-                full_name="Bioconductor System",
-                role="admin",
-                organization_id=bioc_org.id if bioc_org else None,
-            )
-            session.add(system_user)
-            await session.commit()
-
-    await engine.dispose()
-
-
-async def get_database_stats(database_url: str) -> dict:
+    failures = []
+    async with async_session() as session, session.begin():
+        for name, section in SEED_SECTIONS:
+            try:
+                async with session.begin_nested():
+                    await section(session)
+            except Exception as e:
+                failures.append(f"{name}: {e}")
+
+    if failures:
+        raise RuntimeError("Seeding failed for " + "; ".join(failures))
+
+
+async def get_database_stats(database_url: str, exact: bool = False) -> dict:
     """
     Get statistics about the database contents.
 
     Args:
         database_url: PostgreSQL connection string (will be converted to asyncpg)
+        exact: If True, COUNT(*) every table; otherwise read the planner's
+            row estimates from pg_class (tables never analyzed are counted)
 
     Returns:
         Dictionary with table counts
     """
-    async_url = _convert_to_async_url(database_url)
-    engine = create_async_engine(async_url)
-    async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    engine = _get_engine(database_url)
 
-    async with async_session() as session:
+    async with engine.connect() as conn:
+        if exact:
+            # All counts come back as one row in a single round-trip
+            row = (await conn.execute(_STATS_SQL)).one()
+            return dict(row._mapping)
+
+        result = await conn.execute(_ESTIMATED_STATS_SQL, {"names": list(STATS_TABLES)})
+        estimates = dict(result.all())
         stats = {}
+        for table in STATS_TABLES:
+            estimate = estimates.get(table, -1)
+            if estimate < 0:
+                # reltuples is -1 until the table is first vacuumed or analyzed
+                estimate = await conn.scalar(text(f"SELECT COUNT(*) FROM {table}"))
+            stats[table] = estimate
 
-        # Query counts for each table
-        tables = [
-            "organizations",
-            "users",
-            "species",
-            "genomes",
-            "data_providers",
-            "recipes",
-            "hubs",
-            "resource_statuses",
-            "resources",
-            "storage_locations",
-            "resource_files",
-            "source_files",
-            "tags",
-            "resource_tags",
-            "bioc_releases",
-            "resource_bioc_versions",
-            "audit_log",
-        ]
-
-        for table in tables:
-            result = await session.execute(text(f"SELECT COUNT(*) FROM {table}"))
-            count = result.scalar()
-            stats[table] = count
-
-    await engine.dispose()
     return stats
 
 
@@ -184,24 +379,16 @@ async def verify_schema(database_url: str) -> bool:
     Returns:
         True if schema is valid, False otherwise
     """
-    async_url = _convert_to_async_url(database_url)
-    engine = create_async_engine(async_url)
-    async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    engine = _get_engine(database_url)
 
     try:
-        async with async_session() as session:
-            # Try a simple query on each core table
-            await session.execute(select(Hub).limit(1))
-            await session.execute(select(ResourceStatus).limit(1))
-            await session.execute(select(BiocRelease).limit(1))
-            await session.execute(select(User).limit(1))
-            await session.execute(select(Organization).limit(1))
+        async with engine.connect() as conn:
+            # One catalog lookup confirms every core table exists
+            found = await conn.scalar(_VERIFY_SQL, {"names": list(VERIFY_TABLES)})
 
-        await engine.dispose()
-        return True
+        return found == len(VERIFY_TABLES)
 
     except Exception:
-        await engine.dispose()
         return False
 
 
@@ -234,4 +421,6 @@ if __name__ == "__main__":
         for table, count in stats.items():
             print(f"  {table}: {count} records")
 
+        await dispose_engines()
+
     asyncio.run(main())
@@ -5,13 +5,20 @@ Migrates data from annotationhub.sqlite3 and experimenthub.sqlite3 into
 the normalized PostgreSQL schema.
 """
 
+import os
 import re
 import asyncio
-from typing import Dict, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 import sqlite3
-from datetime import datetime
-
-from sqlalchemy import select
+from collections import namedtuple
+from datetime import datetime, timezone
+
+import asyncpg
+from loguru import logger
+from sqlalchemy import select, text, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.schema import CreateIndex, DropIndex
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 
 from .models import (
@@ -29,9 +36,155 @@ from .models import (
     ResourceTag,
     BiocRelease,
     ResourceBiocVersion,
+    Hub,
 )
 from .db_utils import _convert_to_async_url
 
+# Hub ids the resources are loaded under, as seeded by db_utils; checked
+# against the hubs table before anything is written
+HUB_AH_ID, HUB_EH_ID = 1, 2
+HUB_IDS_BY_CODE = {"AH": HUB_AH_ID, "EH": HUB_EH_ID}
+
+# "Name <email>" or "<email>", with surrounding whitespace tolerated
+_MAINTAINER_RE = re.compile(r'^\s*(?:(?P<name>[^<]+?)\s*)?<(?P<email>[^>]+)>\s*$')
+
+# Column order of the tuples handed to COPY by the migrate_* methods
+ResourceRow = namedtuple("ResourceRow", (
+    "hub_id", "hub_accession", "title", "description", "species_id", "genome_id",
+    "coordinate_1_based", "data_provider_id", "recipe_id", "maintainer_id",
+    "status_id", "created_at", "valid_from", "deleted_at",
+))
+RESOURCE_TAG_COPY_COLUMNS = ("resource_id", "tag_id")
+RESOURCE_FILE_COPY_COLUMNS = ("resource_id", "file_path", "rdata_class", "dispatch_class")
+SOURCE_FILE_COPY_COLUMNS = (
+    "resource_id", "source_url", "source_type", "source_version",
+    "md5_hash", "file_size_bytes", "last_modified_date",
+)
+RESOURCE_BIOC_COPY_COLUMNS = ("resource_id", "bioc_release_id")
+
+# Audit timestamps sent in the COPY stream rather than left to the column's
+# now() default; every row in a chunk shares the chunk's read time
+RESOURCE_STAMP_COLUMNS = ("updated_at",)
+RESOURCE_TAG_STAMP_COLUMNS = ("added_at",)
+RESOURCE_FILE_STAMP_COLUMNS = ("valid_from", "created_at", "updated_at")
+SOURCE_FILE_STAMP_COLUMNS = ("valid_from", "created_at")
+RESOURCE_BIOC_STAMP_COLUMNS = ("added_at",)
+
+# Secondary indexes on the bulk-loaded tables; dropped before the hub loads and
+# rebuilt in one pass afterwards. Unique indexes and primary keys stay in place.
+BULK_LOAD_INDEXES = tuple(
+    index
+    for model in (Resource, ResourceTag, ResourceFile, SourceFile, ResourceBiocVersion)
+    for index in sorted(model.__table__.indexes, key=lambda index: index.name)
+    if not index.unique
+)
+
+# Transaction-local settings for rebuilding BULK_LOAD_INDEXES after the load.
+# Each build may use all of maintenance_work_mem on top of shared_buffers, so
+# the defaults fit the shipped 2Gi / 1-CPU Postgres pod; raise them through the
+# environment on larger servers.
+INDEX_BUILD_SETTINGS = {
+    "maintenance_work_mem": os.getenv("INDEX_BUILD_MAINTENANCE_WORK_MEM", "256MB"),
+    "max_parallel_maintenance_workers": os.getenv("INDEX_BUILD_PARALLEL_WORKERS", "0"),
+}
+
+# Storage location_type by URL scheme; anything else is 'local'
+STORAGE_SCHEME_TYPES = {
+    'http://': 'http',
+    'https://': 'http',
+    'ftp://': 'ftp',
+    's3://': 's3',
+}
+
+# Rows per SQLite fetch and per COPY call; statement overhead is gone, so batches only bound client memory
+COPY_BATCH_SIZE = 10_000
+
+# Batches the SQLite reader may run ahead of the COPY writer
+COPY_PIPELINE_DEPTH = 4
+
+# Rows per multi-row entity INSERT; keeps bind parameters well under asyncpg's 32767 limit
+ENTITY_INSERT_BATCH_SIZE = 1000
+
+# Upper bound on any single statement of the bulk load, so a stalled COPY
+# fails the hub instead of hanging the migration
+BULK_COMMAND_TIMEOUT = 3600
+
+# Accession -> id lookup for one hub, run on the bulk-load connection
+_RESOURCE_IDS_SQL = "SELECT hub_accession, id FROM resources WHERE hub_id = $1"
+
+
+
+def open_sqlite(path: str) -> sqlite3.Connection:
+    """Open a SQLite source database tuned for one-pass bulk reads."""
+    # Autocommit mode: reads never open an implicit transaction. Chunks are
+    # fetched from a worker thread, one fetch at a time per connection.
+    conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA query_only=ON")
+    conn.execute("PRAGMA cache_size=-262144")  # 256 MiB page cache keeps the join indexes hot
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA mmap_size=1073741824")  # read pages through a 1 GiB mapping
+    return conn
+
+
+async def _copy_records(conn: asyncpg.Connection, table_name: str, columns: Tuple[str, ...], records):
+    """Bulk-load plain tuples over asyncpg's binary COPY inside the connection's transaction."""
+    await conn.copy_records_to_table(table_name, records=records, columns=list(columns))
+
+
+async def _copy_pipeline(
+    conn: asyncpg.Connection,
+    cursor: sqlite3.Cursor,
+    table_name: str,
+    columns: Tuple[str, ...],
+    build_batch: Callable[[List[sqlite3.Row]], list],
+    stamp_columns: Tuple[str, ...] = (),
+) -> int:
+    """
+    Stream a SQLite query into a Postgres table, overlapping reads and writes.
+
+    A producer fetches each chunk and turns it into COPY tuples with
+    ``build_batch`` in a worker thread, while the consumer sends the previous
+    batch over COPY. The bounded queue keeps at most a few batches in memory.
+    Each ``stamp_columns`` column is appended to every record with a single
+    UTC timestamp taken when the chunk is read. Returns the number of rows
+    copied.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=COPY_PIPELINE_DEPTH)
+    columns = columns + stamp_columns
+
+    def read_batch():
+        rows = cursor.fetchmany(COPY_BATCH_SIZE)
+        if not rows:
+            return None
+        batch = build_batch(rows)
+        if stamp_columns:
+            stamp = (datetime.now(timezone.utc),) * len(stamp_columns)
+            batch = [record + stamp for record in batch]
+        return batch
+
+    async def producer():
+        while (batch := await asyncio.to_thread(read_batch)) is not None:
+            await queue.put(batch)
+        await queue.put(None)
+
+    async def consumer():
+        copied = chunks = 0
+        while (batch := await queue.get()) is not None:
+            chunks += 1
+            if batch:
+                await _copy_records(conn, table_name, columns, batch)
+                copied += len(batch)
+            logger.info("{}: chunk {} done, {} rows copied", table_name, chunks, copied)
+        return copied
+
+    # A TaskGroup cancels the other side if either one fails, so a failed COPY
+    # never leaves the producer blocked on a full queue
+    async with asyncio.TaskGroup() as tg:
+        tg.create_task(producer())
+        copied = tg.create_task(consumer())
+    return copied.result()
+
 
 class DataMigrator:
     """Handles migration from SQLite to PostgreSQL."""
@@ -46,6 +199,8 @@ class DataMigrator:
             sqlite_eh_path: Path to experimenthub.sqlite3
         """
         self.postgres_url = _convert_to_async_url(postgres_url)
+        # Plain libpq DSN for the asyncpg pool used by the bulk-load phases
+        self.asyncpg_dsn = make_url(self.postgres_url).set(drivername="postgresql").render_as_string(hide_password=False)
         self.sqlite_ah_path = sqlite_ah_path
         self.sqlite_eh_path = sqlite_eh_path
 
@@ -55,10 +210,11 @@ class DataMigrator:
         self.provider_cache: Dict[str, int] = {}
         self.user_cache: Dict[str, int] = {}
         self.recipe_cache: Dict[str, int] = {}
-        self.storage_cache: Dict[str, int] = {}
+        self.storage_cache: Dict[str, int] = {}  # base_url (location prefix) -> id
         self.tag_cache: Dict[str, int] = {}
         self.status_cache: Dict[str, int] = {}
         self.bioc_release_cache: Dict[str, int] = {}
+        self.resource_id_by_accession: Dict[int, Dict[str, int]] = {}  # hub_id -> {hub_accession: id}
 
     @staticmethod
     def parse_maintainer_email(maintainer: str) -> Tuple[Optional[str], Optional[str]]:
@@ -73,17 +229,11 @@ class DataMigrator:
         if not maintainer:
             return None, None
 
-        # Pattern: Name <email>
-        match = re.match(r'^(.+?)\s*<(.+?)>$', maintainer.strip())
-        if match:
-            name = match.group(1).strip() or None
-            email = match.group(2).strip()
-            return name, email
-
-        # Pattern: <email>
-        match = re.match(r'^<(.+?)>$', maintainer.strip())
+        # Patterns: "Name <email>" and "<email>"
+        match = _MAINTAINER_RE.match(maintainer)
         if match:
-            return None, match.group(1).strip()
+            name = match.group('name')
+            return (name.strip() or None) if name else None, match.group('email').strip()
 
         # Plain email
         if '@' in maintainer:
@@ -93,754 +243,668 @@ class DataMigrator:
 
     async def load_caches(self, session: AsyncSession):
         """Pre-load lookup caches from existing PostgreSQL data."""
-        # Load statuses
-        result = await session.execute(select(ResourceStatus))
-        for status in result.scalars():
-            self.status_cache[status.status] = status.id
-
-        # Load bioc releases
-        result = await session.execute(select(BiocRelease))
-        for release in result.scalars():
-            self.bioc_release_cache[release.version] = release.id
-
-        # Load species
-        result = await session.execute(select(Species))
-        for species in result.scalars():
-            self.species_cache[species.scientific_name] = species.id
-
-        # Load genomes
-        result = await session.execute(select(Genome))
-        for genome in result.scalars():
-            species_result = await session.execute(
-                select(Species).where(Species.id == genome.species_id)
-            )
-            species = species_result.scalar_one()
-            self.genome_cache[(species.scientific_name, genome.genome_build)] = genome.id
-
-        # Load providers
-        result = await session.execute(select(DataProvider))
-        for provider in result.scalars():
-            self.provider_cache[provider.name] = provider.id
-
-        # Load users
-        result = await session.execute(select(User))
-        for user in result.scalars():
-            self.user_cache[user.email] = user.id
-
-        # Load recipes
-        result = await session.execute(select(Recipe))
-        for recipe in result.scalars():
-            self.recipe_cache[recipe.name] = recipe.id
-
-        # Load storage locations
-        result = await session.execute(select(StorageLocation))
-        for storage in result.scalars():
-            self.storage_cache[storage.name] = storage.id
-
-        # Load tags
-        result = await session.execute(select(Tag))
-        for tag in result.scalars():
-            self.tag_cache[tag.tag] = tag.id
-
-    async def extract_and_create_species(self, session: AsyncSession, sqlite_conn: sqlite3.Connection):
-        """Extract unique species from SQLite and create in PostgreSQL."""
-        print("  Extracting species...")
-
-        # Group by taxonomy_id to handle duplicates (same tax ID, different names)
-        cursor = sqlite_conn.execute("""
-            SELECT species, taxonomyid, COUNT(*) as cnt
-            FROM resources
-            WHERE species IS NOT NULL AND taxonomyid IS NOT NULL
-            GROUP BY taxonomyid, species
-            ORDER BY taxonomyid, cnt DESC
-        """)
-
-        # Track taxonomy IDs to handle duplicates
-        taxonomy_id_map = {}  # taxonomy_id -> species_name
-        species_data = []
-
-        for row in cursor:
-            species_name, taxonomy_id, count = row
-
-            # Use the first (most common) name for each taxonomy_id
-            if taxonomy_id not in taxonomy_id_map:
-                taxonomy_id_map[taxonomy_id] = species_name
-                species_data.append((species_name, taxonomy_id))
+        # Select (key, id) tuples only; hydrating ORM objects is unnecessary here
+        cache_queries = (
+            (self.status_cache, select(ResourceStatus.status, ResourceStatus.id)),
+            (self.bioc_release_cache, select(BiocRelease.version, BiocRelease.id)),
+            (self.species_cache, select(Species.scientific_name, Species.id)),
+            (self.provider_cache, select(DataProvider.name, DataProvider.id)),
+            (self.user_cache, select(User.email, User.id)),
+            (self.recipe_cache, select(Recipe.name, Recipe.id)),
+            (self.storage_cache, select(StorageLocation.base_url, StorageLocation.id)),
+            (self.tag_cache, select(Tag.tag, Tag.id)),
+        )
+        for cache, stmt in cache_queries:
+            result = await session.execute(stmt)
+            cache.update(result.tuples())
+
+        # Load genomes keyed by (species name, build) in one joined query
+        result = await session.execute(
+            select(Species.scientific_name, Genome.genome_build, Genome.id)
+            .join(Species, Species.id == Genome.species_id)
+        )
+        for species_name, genome_build, genome_id in result:
+            self.genome_cache[(species_name, genome_build)] = genome_id
+
+    async def check_hub_ids(self, session: AsyncSession):
+        """Fail fast if the hubs table does not use the ids the migration writes."""
+        result = await session.execute(select(Hub.code, Hub.id).where(Hub.code.in_(HUB_IDS_BY_CODE)))
+        found = dict(result.tuples())
+        if found != HUB_IDS_BY_CODE:
+            raise RuntimeError(f"hubs table ids {found} do not match the expected {HUB_IDS_BY_CODE}")
+
+    async def load_resource_ids(self, conn: asyncpg.Connection, hub_id: int) -> Dict[str, int]:
+        """Map hub accessions to PostgreSQL resource ids for one hub, loaded once."""
+        if hub_id not in self.resource_id_by_accession:
+            rows = await conn.fetch(_RESOURCE_IDS_SQL, hub_id)
+            self.resource_id_by_accession[hub_id] = {accession: resource_id for accession, resource_id in rows}
+        return self.resource_id_by_accession[hub_id]
+
+    async def insert_missing(self, session: AsyncSession, model, rows, key_column, cache: Dict) -> int:
+        """
+        Bulk insert entity rows with ON CONFLICT DO NOTHING RETURNING.
 
-        # Create species records
-        count = 0
-        for species_name, taxonomy_id in species_data:
-            if species_name not in self.species_cache:
-                # Check if species with this taxonomy_id already exists in DB
-                result = await session.execute(
-                    select(Species).where(Species.taxonomy_id == taxonomy_id)
-                )
-                existing = result.scalar_one_or_none()
-
-                if existing:
-                    # Already exists, just cache it
-                    self.species_cache[species_name] = existing.id
-                else:
-                    # Create new species
-                    species = Species(
-                        scientific_name=species_name,
-                        taxonomy_id=taxonomy_id
-                    )
-                    session.add(species)
-                    await session.flush()
-                    self.species_cache[species_name] = species.id
-                    count += 1
+        Ids of inserted rows come back from RETURNING; rows that already existed
+        are resolved with one follow-up SELECT per batch. Both land in ``cache``
+        keyed by ``key_column``. Returns the number of rows actually inserted.
+        """
+        key = key_column.key
+        created = 0
+        for start in range(0, len(rows), ENTITY_INSERT_BATCH_SIZE):
+            chunk = rows[start:start + ENTITY_INSERT_BATCH_SIZE]
+            result = await session.execute(
+                pg_insert(model).values(chunk).on_conflict_do_nothing().returning(key_column, model.id)
+            )
+            inserted = dict(result.tuples())
+            cache.update(inserted)
+            created += len(inserted)
+
+            existing = [row[key] for row in chunk if row[key] not in inserted]
+            if existing:
+                result = await session.execute(select(key_column, model.id).where(key_column.in_(existing)))
+                cache.update(result.tuples())
+        return created
+
+    async def extract_and_create_species(self, session: AsyncSession, sqlite_conns: List[sqlite3.Connection]):
+        """Extract unique species from every SQLite file and create them in PostgreSQL."""
+        logger.info("Extracting species...")
+
+        # taxonomy_id -> names; the first (most common) name per file, earlier files first
+        taxonomy_names: Dict[int, List[str]] = {}
+
+        for sqlite_conn in sqlite_conns:
+            # Group by taxonomy_id to handle duplicates (same tax ID, different names)
+            cursor = sqlite_conn.execute("""
+                SELECT species, taxonomyid, COUNT(*) as cnt
+                FROM resources
+                WHERE species IS NOT NULL AND taxonomyid IS NOT NULL
+                GROUP BY taxonomyid, species
+                ORDER BY taxonomyid, cnt DESC
+            """)
+
+            seen = set()
+            for species_name, taxonomy_id, _ in cursor.fetchall():
+                if taxonomy_id not in seen and species_name not in self.species_cache:
+                    names = taxonomy_names.setdefault(taxonomy_id, [])
+                    if species_name not in names:
+                        names.append(species_name)
+                seen.add(taxonomy_id)
+
+        # Species rows conflict on taxonomy_id, so resolve ids by taxonomy_id first
+        rows = [
+            {"scientific_name": names[0], "taxonomy_id": taxonomy_id}
+            for taxonomy_id, names in taxonomy_names.items()
+        ]
+        ids_by_taxonomy: Dict[int, int] = {}
+        count = await self.insert_missing(session, Species, rows, Species.taxonomy_id, ids_by_taxonomy)
+        for taxonomy_id, species_id in ids_by_taxonomy.items():
+            for species_name in taxonomy_names[taxonomy_id]:
+                self.species_cache[species_name] = species_id
 
         await session.commit()
-        print(f"    Created {count} species (total: {len(self.species_cache)})")
-
-    async def extract_and_create_genomes(self, session: AsyncSession, sqlite_conn: sqlite3.Connection):
-        """Extract unique genomes from SQLite and create in PostgreSQL."""
-        print("  Extracting genomes...")
-
-        cursor = sqlite_conn.execute("""
-            SELECT DISTINCT species, genome
-            FROM resources
-            WHERE species IS NOT NULL AND genome IS NOT NULL
-            ORDER BY species, genome
-        """)
+        logger.info("Created {} species (total: {})", count, len(self.species_cache))
 
-        count = 0
-        for row in cursor:
-            species_name, genome_build = row
-            key = (species_name, genome_build)
+    async def extract_and_create_genomes(self, session: AsyncSession, sqlite_conns: List[sqlite3.Connection]):
+        """Extract unique genomes from every SQLite file and create them in PostgreSQL."""
+        logger.info("Extracting genomes...")
 
-            if key not in self.genome_cache and species_name in self.species_cache:
-                # Check if genome already exists
-                result = await session.execute(
-                    select(Genome).where(
-                        Genome.species_id == self.species_cache[species_name],
-                        Genome.genome_build == genome_build
-                    )
-                )
-                existing = result.scalar_one_or_none()
-
-                if existing:
-                    self.genome_cache[key] = existing.id
-                else:
-                    genome = Genome(
-                        species_id=self.species_cache[species_name],
-                        genome_build=genome_build
-                    )
-                    session.add(genome)
-                    await session.flush()
-                    self.genome_cache[key] = genome.id
-                    count += 1
+        species_names = {}  # species_id -> species_name
+        keys = {}  # (species_id, genome_build) -> row, merged across files
 
-        await session.commit()
-        print(f"    Created {count} genomes (total: {len(self.genome_cache)})")
+        for sqlite_conn in sqlite_conns:
+            cursor = sqlite_conn.execute("""
+                SELECT DISTINCT species, genome
+                FROM resources
+                WHERE species IS NOT NULL AND genome IS NOT NULL
+                ORDER BY species, genome
+            """)
 
-    async def extract_and_create_providers(self, session: AsyncSession, sqlite_conn: sqlite3.Connection):
-        """Extract unique data providers from SQLite and create in PostgreSQL."""
-        print("  Extracting data providers...")
+            for species_name, genome_build in cursor.fetchall():
+                if (species_name, genome_build) not in self.genome_cache and species_name in self.species_cache:
+                    species_id = self.species_cache[species_name]
+                    species_names.setdefault(species_id, species_name)
+                    keys.setdefault((species_id, genome_build), {"species_id": species_id, "genome_build": genome_build})
 
-        cursor = sqlite_conn.execute("""
-            SELECT DISTINCT dataprovider
-            FROM resources
-            WHERE dataprovider IS NOT NULL
-            ORDER BY dataprovider
-        """)
+        rows = list(keys.values())
 
+        # Genomes are unique on (species_id, genome_build), so key on the pair
         count = 0
-        for row in cursor:
-            provider_name = row[0]
-            if provider_name not in self.provider_cache:
-                # Check if provider already exists
+        for start in range(0, len(rows), ENTITY_INSERT_BATCH_SIZE):
+            chunk = rows[start:start + ENTITY_INSERT_BATCH_SIZE]
+            result = await session.execute(
+                pg_insert(Genome).values(chunk).on_conflict_do_nothing()
+                .returning(Genome.species_id, Genome.genome_build, Genome.id)
+            )
+            inserted = {(species_id, build): genome_id for species_id, build, genome_id in result}
+            count += len(inserted)
+
+            existing = [
+                (row["species_id"], row["genome_build"]) for row in chunk
+                if (row["species_id"], row["genome_build"]) not in inserted
+            ]
+            if existing:
                 result = await session.execute(
-                    select(DataProvider).where(DataProvider.name == provider_name)
+                    select(Genome.species_id, Genome.genome_build, Genome.id)
+                    .where(tuple_(Genome.species_id, Genome.genome_build).in_(existing))
                 )
-                existing = result.scalar_one_or_none()
+                inserted.update({(species_id, build): genome_id for species_id, build, genome_id in result})
 
-                if existing:
-                    self.provider_cache[provider_name] = existing.id
-                else:
-                    provider = DataProvider(name=provider_name)
-                    session.add(provider)
-                    await session.flush()
-                    self.provider_cache[provider_name] = provider.id
-                    count += 1
+            for (species_id, genome_build), genome_id in inserted.items():
+                self.genome_cache[(species_names[species_id], genome_build)] = genome_id
 
         await session.commit()
-        print(f"    Created {count} data providers (total: {len(self.provider_cache)})")
+        logger.info("Created {} genomes (total: {})", count, len(self.genome_cache))
+
+    async def extract_and_create_providers(self, session: AsyncSession, sqlite_conns: List[sqlite3.Connection]):
+        """Extract unique data providers from every SQLite file and create them in PostgreSQL."""
+        logger.info("Extracting data providers...")
+
+        provider_names = {}  # insertion-ordered set of names, merged across files
+        for sqlite_conn in sqlite_conns:
+            cursor = sqlite_conn.execute("""
+                SELECT DISTINCT dataprovider
+                FROM resources
+                WHERE dataprovider IS NOT NULL
+                ORDER BY dataprovider
+            """)
+            for (provider_name,) in cursor.fetchall():
+                if provider_name not in self.provider_cache:
+                    provider_names[provider_name] = None
+
+        rows = [{"name": provider_name} for provider_name in provider_names]
+        count = await self.insert_missing(session, DataProvider, rows, DataProvider.name, self.provider_cache)
 
-    async def extract_and_create_users(self, session: AsyncSession, sqlite_conn: sqlite3.Connection):
-        """Extract unique users from maintainer field and create in PostgreSQL."""
-        print("  Extracting users...")
+        await session.commit()
+        logger.info("Created {} data providers (total: {})", count, len(self.provider_cache))
+
+    async def extract_and_create_users(self, session: AsyncSession, sqlite_conns: List[sqlite3.Connection]):
+        """Extract unique users from every SQLite file's maintainer field and create them in PostgreSQL."""
+        logger.info("Extracting users...")
+
+        users = {}  # email -> full_name; the first maintainer string wins
+        for sqlite_conn in sqlite_conns:
+            cursor = sqlite_conn.execute("""
+                SELECT DISTINCT maintainer
+                FROM resources
+                WHERE maintainer IS NOT NULL
+                ORDER BY maintainer
+            """)
+
+            for (maintainer_str,) in cursor.fetchall():
+                full_name, email = self.parse_maintainer_email(maintainer_str)
+                if email and email not in self.user_cache and email not in users:
+                    users[email] = full_name
+
+        rows = [
+            {"email": email, "full_name": full_name, "role": "maintainer"}
+            for email, full_name in users.items()
+        ]
+        count = await self.insert_missing(session, User, rows, User.email, self.user_cache)
 
-        cursor = sqlite_conn.execute("""
-            SELECT DISTINCT maintainer
-            FROM resources
-            WHERE maintainer IS NOT NULL
-            ORDER BY maintainer
-        """)
+        await session.commit()
+        logger.info("Created {} users (total: {})", count, len(self.user_cache))
 
-        count = 0
-        for row in cursor:
-            maintainer_str = row[0]
-            full_name, email = self.parse_maintainer_email(maintainer_str)
+    async def extract_and_create_recipes(self, session: AsyncSession, sqlite_conns: List[sqlite3.Connection]):
+        """
+        Extract recipes from every SQLite file and create them in PostgreSQL.
 
-            if email and email not in self.user_cache:
-                # Check if user already exists
-                result = await session.execute(
-                    select(User).where(User.email == email)
-                )
-                existing = result.scalar_one_or_none()
-
-                if existing:
-                    self.user_cache[email] = existing.id
-                else:
-                    user = User(
-                        email=email,
-                        full_name=full_name,
-                        role="maintainer"
-                    )
-                    session.add(user)
-                    await session.flush()
-                    self.user_cache[email] = user.id
-                    count += 1
+        Returns one SQLite recipe ID -> PostgreSQL ID map per connection.
+        """
+        logger.info("Extracting recipes...")
+
+        recipe_sqlite_ids = []  # per connection: recipe name -> SQLite ID
+        rows = {}  # recipe name -> row; every row carries the same keys for the multi-row insert
+
+        for sqlite_conn in sqlite_conns:
+            # Get recipes from recipes table
+            cursor = sqlite_conn.execute("""
+                SELECT id, recipe, package
+                FROM recipes
+                ORDER BY id
+            """)
+
+            sqlite_ids = {}
+            for sqlite_id, recipe_name, package_name in cursor.fetchall():
+                if recipe_name and recipe_name not in self.recipe_cache:
+                    sqlite_ids.setdefault(recipe_name, sqlite_id)
+                    rows.setdefault(recipe_name, {"name": recipe_name, "package_name": package_name, "preparer_class": None})
+            recipe_sqlite_ids.append(sqlite_ids)
+
+            # Also get unique preparer classes
+            cursor = sqlite_conn.execute("""
+                SELECT DISTINCT preparerclass
+                FROM resources
+                WHERE preparerclass IS NOT NULL
+                ORDER BY preparerclass
+            """)
+
+            for (preparer_class,) in cursor.fetchall():
+                if preparer_class and preparer_class not in self.recipe_cache and preparer_class not in rows:
+                    rows[preparer_class] = {"name": preparer_class, "package_name": None, "preparer_class": preparer_class}
+
+        count = await self.insert_missing(session, Recipe, list(rows.values()), Recipe.name, self.recipe_cache)
+
+        recipe_id_maps = [
+            {  # SQLite ID -> PostgreSQL ID
+                sqlite_id: self.recipe_cache[recipe_name]
+                for recipe_name, sqlite_id in sqlite_ids.items()
+                if recipe_name in self.recipe_cache
+            }
+            for sqlite_ids in recipe_sqlite_ids
+        ]
 
         await session.commit()
-        print(f"    Created {count} users (total: {len(self.user_cache)})")
+        logger.info("Created {} recipes (total: {})", count, len(self.recipe_cache))
+        return recipe_id_maps
 
-    async def extract_and_create_recipes(self, session: AsyncSession, sqlite_conn: sqlite3.Connection):
-        """Extract recipes from SQLite and create in PostgreSQL."""
-        print("  Extracting recipes...")
-
-        # Get recipes from recipes table
-        cursor = sqlite_conn.execute("""
-            SELECT id, recipe, package
-            FROM recipes
-            ORDER BY id
-        """)
-
-        recipe_id_map = {}  # SQLite ID -> PostgreSQL ID
-        count = 0
+    async def extract_and_create_storage_locations(self, session: AsyncSession, sqlite_conns: List[sqlite3.Connection]):
+        """
+        Extract storage locations from every SQLite file and create them in PostgreSQL.
 
-        for row in cursor:
-            sqlite_id, recipe_name, package_name = row
-            if recipe_name and recipe_name not in self.recipe_cache:
-                # Check if recipe already exists
-                result = await session.execute(
-                    select(Recipe).where(Recipe.name == recipe_name)
-                )
-                existing = result.scalar_one_or_none()
-
-                if existing:
-                    self.recipe_cache[recipe_name] = existing.id
-                    recipe_id_map[sqlite_id] = existing.id
-                else:
-                    recipe = Recipe(
-                        name=recipe_name,
-                        package_name=package_name
+        Returns one SQLite location ID -> PostgreSQL ID map per connection.
+        """
+        logger.info("Extracting storage locations...")
+
+        storage_prefixes = []  # per connection: SQLite ID -> location prefix
+        rows = {}  # location prefix -> row, merged across files
+
+        for sqlite_conn in sqlite_conns:
+            cursor = sqlite_conn.execute("""
+                SELECT id, location_prefix
+                FROM location_prefixes
+                ORDER BY id
+            """)
+
+            prefixes = {}
+            for sqlite_id, location_prefix in cursor.fetchall():
+                if not location_prefix:
+                    continue
+                prefixes[sqlite_id] = location_prefix
+
+                # One storage location per distinct prefix, across ids and files
+                if location_prefix not in self.storage_cache and location_prefix not in rows:
+                    storage_type = next(
+                        (kind for scheme, kind in STORAGE_SCHEME_TYPES.items() if location_prefix.startswith(scheme)),
+                        'local',
                     )
-                    session.add(recipe)
-                    await session.flush()
-                    self.recipe_cache[recipe_name] = recipe.id
-                    recipe_id_map[sqlite_id] = recipe.id
-                    count += 1
+                    rows[location_prefix] = {"name": location_prefix, "location_type": storage_type, "base_url": location_prefix}
+            storage_prefixes.append(prefixes)
 
-        # Also get unique preparer classes
-        cursor = sqlite_conn.execute("""
-            SELECT DISTINCT preparerclass
-            FROM resources
-            WHERE preparerclass IS NOT NULL
-            ORDER BY preparerclass
-        """)
+        count = await self.insert_missing(session, StorageLocation, list(rows.values()), StorageLocation.base_url, self.storage_cache)
 
-        for row in cursor:
-            preparer_class = row[0]
-            if preparer_class and preparer_class not in self.recipe_cache:
-                # Check if recipe already exists
-                result = await session.execute(
-                    select(Recipe).where(Recipe.name == preparer_class)
-                )
-                existing = result.scalar_one_or_none()
-
-                if existing:
-                    self.recipe_cache[preparer_class] = existing.id
-                else:
-                    recipe = Recipe(
-                        name=preparer_class,
-                        preparer_class=preparer_class
-                    )
-                    session.add(recipe)
-                    await session.flush()
-                    self.recipe_cache[preparer_class] = recipe.id
-                    count += 1
+        location_id_maps = [
+            {  # SQLite ID -> PostgreSQL ID
+                sqlite_id: self.storage_cache[location_prefix]
+                for sqlite_id, location_prefix in prefixes.items()
+                if location_prefix in self.storage_cache
+            }
+            for prefixes in storage_prefixes
+        ]
 
         await session.commit()
-        print(f"    Created {count} recipes (total: {len(self.recipe_cache)})")
-        return recipe_id_map
-
-    async def extract_and_create_storage_locations(self, session: AsyncSession, sqlite_conn: sqlite3.Connection):
-        """Extract storage locations from SQLite and create in PostgreSQL."""
-        print("  Extracting storage locations...")
-
-        cursor = sqlite_conn.execute("""
-            SELECT id, location_prefix
-            FROM location_prefixes
-            ORDER BY id
-        """)
-
-        location_id_map = {}  # SQLite ID -> PostgreSQL ID
-        count = 0
+        logger.info("Created {} storage locations (total: {})", count, len(self.storage_cache))
+        return location_id_maps
+
+    async def extract_and_create_tags(self, session: AsyncSession, sqlite_conns: List[sqlite3.Connection]):
+        """Extract unique tags from every SQLite file and create them in PostgreSQL."""
+        logger.info("Extracting tags...")
+
+        tag_names = {}  # insertion-ordered set of tags, merged across files
+        for sqlite_conn in sqlite_conns:
+            cursor = sqlite_conn.execute("""
+                SELECT DISTINCT tag
+                FROM tags
+                WHERE tag IS NOT NULL
+                ORDER BY tag
+            """)
+            for (tag_name,) in cursor.fetchall():
+                if tag_name and tag_name not in self.tag_cache:
+                    tag_names[tag_name] = None
+
+        rows = [{"tag": tag_name} for tag_name in tag_names]
+        count = await self.insert_missing(session, Tag, rows, Tag.tag, self.tag_cache)
 
-        for row in cursor:
-            sqlite_id, location_prefix = row
-            storage_name = f"Storage {sqlite_id}"
+        await session.commit()
+        logger.info("Created {} tags (total: {})", count, len(self.tag_cache))
 
-            if location_prefix and storage_name not in self.storage_cache:
-                # Check if storage location already exists
-                result = await session.execute(
-                    select(StorageLocation).where(StorageLocation.name == storage_name)
-                )
-                existing = result.scalar_one_or_none()
-
-                if existing:
-                    self.storage_cache[storage_name] = existing.id
-                    location_id_map[sqlite_id] = existing.id
-                else:
-                    # Determine storage type from URL
-                    if location_prefix.startswith('http://') or location_prefix.startswith('https://'):
-                        storage_type = 'http'
-                    elif location_prefix.startswith('ftp://'):
-                        storage_type = 'ftp'
-                    elif location_prefix.startswith('s3://'):
-                        storage_type = 's3'
-                    else:
-                        storage_type = 'local'
-
-                    storage = StorageLocation(
-                        name=storage_name,
-                        location_type=storage_type,
-                        base_url=location_prefix
-                    )
-                    session.add(storage)
-                    await session.flush()
-                    self.storage_cache[storage_name] = storage.id
-                    location_id_map[sqlite_id] = storage.id
-                    count += 1
-            elif storage_name in self.storage_cache:
-                # Already in cache, just add to map
-                location_id_map[sqlite_id] = self.storage_cache[storage_name]
+    async def extract_entities(self, async_session: async_sessionmaker, sqlite_conns: List[sqlite3.Connection]):
+        """
+        Run the extract_* phases over every SQLite file concurrently.
 
-        await session.commit()
-        print(f"    Created {count} storage locations (total: {len(self.storage_cache)})")
-        return location_id_map
+        Each phase merges its rows across all files before one bulk insert.
+        The phases write disjoint tables, so each runs on its own session and
+        their round-trips overlap. Genomes need species ids and stay behind
+        species in a single chain. Returns per-connection lists of
+        (recipe_id_map, storage_id_map).
+        """
+        async def in_session(*steps):
+            async with async_session() as session:
+                for step in steps:
+                    result = await step(session, sqlite_conns)
+                return result
+
+        _, _, _, recipe_id_maps, storage_id_maps, _ = await asyncio.gather(
+            in_session(self.extract_and_create_species, self.extract_and_create_genomes),
+            in_session(self.extract_and_create_providers),
+            in_session(self.extract_and_create_users),
+            in_session(self.extract_and_create_recipes),
+            in_session(self.extract_and_create_storage_locations),
+            in_session(self.extract_and_create_tags),
+        )
+        return recipe_id_maps, storage_id_maps
 
     async def migrate_hub_resources(
         self,
-        session: AsyncSession,
-        sqlite_path: str,
+        conn: asyncpg.Connection,
+        sqlite_conn: sqlite3.Connection,
         hub_name: str,
         hub_id: int,
         recipe_id_map: Dict[int, int],
         storage_id_map: Dict[int, int]
     ):
         """Migrate resources from a specific hub's SQLite database."""
-        print(f"\n  Migrating {hub_name} resources...")
+        logger.info("Migrating {} resources...", hub_name)
 
-        conn = sqlite3.connect(sqlite_path)
-        conn.row_factory = sqlite3.Row
+        # Resolve every distinct maintainer string to a user id up front, so the
+        # row loop below does a dict lookup instead of a regex parse per resource
+        maintainer_ids = {}
+        for (maintainer_str,) in sqlite_conn.execute("SELECT DISTINCT maintainer FROM resources WHERE maintainer IS NOT NULL").fetchall():
+            _, email = self.parse_maintainer_email(maintainer_str)
+            if email in self.user_cache:
+                maintainer_ids[maintainer_str] = self.user_cache[email]
 
-        cursor = conn.execute("""
+        cursor = sqlite_conn.execute("""
             SELECT *
             FROM resources
             ORDER BY id
         """)
 
-        resources_created = 0
-        batch_size = 1000
-        batch = []
-
-        for row in cursor:
-            # Get foreign key IDs
-            species_id = self.species_cache.get(row['species'])
-            genome_id = self.genome_cache.get((row['species'], row['genome'])) if row['species'] and row['genome'] else None
-            provider_id = self.provider_cache.get(row['dataprovider'])
-            status_id = self.status_cache.get(row['status_id']) if 'status_id' in row.keys() else self.status_cache.get('Public', 1)
-
-            # Parse maintainer
-            _, email = self.parse_maintainer_email(row['maintainer']) if row['maintainer'] else (None, None)
-            maintainer_id = self.user_cache.get(email) if email else None
-
-            # Get recipe ID
-            recipe_id = None
-            if row['recipe_id'] and row['recipe_id'] in recipe_id_map:
-                recipe_id = recipe_id_map[row['recipe_id']]
-            elif row['preparerclass']:
-                recipe_id = self.recipe_cache.get(row['preparerclass'])
-
-            # Create resource
-            resource = Resource(
-                hub_id=hub_id,
-                hub_accession=row['ah_id'],
-                title=row['title'],
-                description=row['description'],
-                species_id=species_id,
-                genome_id=genome_id,
-                coordinate_1_based=bool(row['coordinate_1_based']) if row['coordinate_1_based'] is not None else None,
-                data_provider_id=provider_id,
-                recipe_id=recipe_id,
-                maintainer_id=maintainer_id,
-                status_id=status_id or 1,  # Default to Public
-                created_at=datetime.fromisoformat(row['rdatadateadded']) if row['rdatadateadded'] else datetime.now(),
-                valid_from=datetime.fromisoformat(row['rdatadateadded']) if row['rdatadateadded'] else datetime.now(),
-                deleted_at=datetime.fromisoformat(row['rdatadateremoved']) if row['rdatadateremoved'] else None,
-            )
-
-            batch.append(resource)
-            resources_created += 1
+        parse_date = datetime.fromisoformat
+        now = datetime.now()  # one timestamp for every row missing rdatadateadded
+        has_status_column = any(column[0] == 'status_id' for column in cursor.description)
+        default_status_id = self.status_cache.get('Public', 1)
+
+        def build_batch(rows):
+            batch = []
+            for row in rows:
+                # Get foreign key IDs
+                species_id = self.species_cache.get(row['species'])
+                genome_id = self.genome_cache.get((row['species'], row['genome'])) if row['species'] and row['genome'] else None
+                provider_id = self.provider_cache.get(row['dataprovider'])
+                status_id = self.status_cache.get(row['status_id']) if has_status_column else default_status_id
+
+                maintainer_id = maintainer_ids.get(row['maintainer'])
+
+                # Get recipe ID
+                recipe_id = None
+                if row['recipe_id'] and row['recipe_id'] in recipe_id_map:
+                    recipe_id = recipe_id_map[row['recipe_id']]
+                elif row['preparerclass']:
+                    recipe_id = self.recipe_cache.get(row['preparerclass'])
+
+                added_at = parse_date(added) if (added := row['rdatadateadded']) else now
+                batch.append(ResourceRow(
+                    hub_id,
+                    row['ah_id'],
+                    row['title'],
+                    row['description'],
+                    species_id,
+                    genome_id,
+                    bool(row['coordinate_1_based']) if row['coordinate_1_based'] is not None else None,
+                    provider_id,
+                    recipe_id,
+                    maintainer_id,
+                    status_id or 1,  # Default to Public
+                    added_at,
+                    added_at,
+                    parse_date(removed) if (removed := row['rdatadateremoved']) else None,
+                ))
+            return batch
+
+        # The hub stays in one transaction until migrate_hub commits
+        resources_created = await _copy_pipeline(
+            conn, cursor, Resource.__tablename__, ResourceRow._fields, build_batch,
+            stamp_columns=RESOURCE_STAMP_COLUMNS,
+        )
+
+        self.resource_id_by_accession.pop(hub_id, None)  # reload with the new rows on next use
+        logger.info("Migrated {} resources from {}", resources_created, hub_name)
 
-            # Commit in batches
-            if len(batch) >= batch_size:
-                session.add_all(batch)
-                await session.flush()
-                batch = []
-                print(f"    Migrated {resources_created} resources...", end='\r')
-
-        # Commit remaining
-        if batch:
-            session.add_all(batch)
-            await session.flush()
-
-        await session.commit()
-        print(f"    Migrated {resources_created} resources from {hub_name}")
-
-        conn.close()
         return resources_created
 
-    async def migrate_tags(self, session: AsyncSession, sqlite_path: str, hub_id: int):
-        """Migrate tags for resources."""
-        print("  Migrating tags...")
-
-        conn = sqlite3.connect(sqlite_path)
-        conn.row_factory = sqlite3.Row
-
-        # First, extract unique tags and create Tag records
-        cursor = conn.execute("""
-            SELECT DISTINCT tag
-            FROM tags
-            WHERE tag IS NOT NULL
-            ORDER BY tag
-        """)
-
-        new_tags = 0
-        for row in cursor:
-            tag_name = row['tag']
-            if tag_name and tag_name not in self.tag_cache:
-                tag = Tag(tag=tag_name)
-                session.add(tag)
-                await session.flush()
-                self.tag_cache[tag_name] = tag.id
-                new_tags += 1
+    async def migrate_tags(self, conn: asyncpg.Connection, sqlite_conn: sqlite3.Connection, hub_id: int):
+        """Migrate resource-tag relationships; Tag rows come from extract_and_create_tags."""
+        logger.info("Migrating tags for hub {}...", hub_id)
 
-        await session.commit()
-        print(f"    Created {new_tags} new tags")
-
-        # Now create resource-tag relationships
         # Need to map old resource IDs to new ones
+        resource_ids = await self.load_resource_ids(conn, hub_id)
         # Use DISTINCT to avoid duplicate (resource, tag) pairs
-        cursor = conn.execute("""
+        cursor = sqlite_conn.execute("""
             SELECT DISTINCT r.ah_id, t.tag
             FROM tags t
             JOIN resources r ON t.resource_id = r.id
             WHERE t.tag IS NOT NULL
         """)
 
-        resource_tags_created = 0
-        batch = []
-        batch_size = 5000
-
-        for row in cursor:
-            hub_accession = row['ah_id']
-            tag_name = row['tag']
-
-            if tag_name in self.tag_cache:
-                # Find the PostgreSQL resource by hub_accession
-                result = await session.execute(
-                    select(Resource).where(
-                        Resource.hub_id == hub_id,
-                        Resource.hub_accession == hub_accession
-                    ).limit(1)
-                )
-                resource = result.scalar_one_or_none()
+        tag_ids = self.tag_cache
 
-                if resource:
-                    resource_tag = ResourceTag(
-                        resource_id=resource.id,
-                        tag_id=self.tag_cache[tag_name]
-                    )
-                    batch.append(resource_tag)
-                    resource_tags_created += 1
+        # Both ids are already in memory, so each chunk becomes a COPY batch in one comprehension
+        resource_tags_created = await _copy_pipeline(
+            conn, cursor, ResourceTag.__tablename__, RESOURCE_TAG_COPY_COLUMNS,
+            lambda rows: [
+                (resource_ids[hub_accession], tag_ids[tag_name])
+                for hub_accession, tag_name in rows
+                if hub_accession in resource_ids and tag_name in tag_ids
+            ],
+            stamp_columns=RESOURCE_TAG_STAMP_COLUMNS,
+        )
 
-                    if len(batch) >= batch_size:
-                        session.add_all(batch)
-                        await session.flush()
-                        batch = []
-                        print(f"    Created {resource_tags_created} resource-tag links...", end='\r')
+        logger.info("Created {} resource-tag relationships for hub {}", resource_tags_created, hub_id)
 
-        if batch:
-            session.add_all(batch)
-            await session.flush()
-
-        await session.commit()
-        print(f"    Created {resource_tags_created} resource-tag relationships")
-
-        conn.close()
-
-    async def migrate_resource_files(self, session: AsyncSession, sqlite_path: str, hub_id: int, storage_id_map: Dict[int, int]):
+    async def migrate_resource_files(self, conn: asyncpg.Connection, sqlite_conn: sqlite3.Connection, hub_id: int, storage_id_map: Dict[int, int]):
         """Migrate resource files (rdatapaths)."""
-        print("  Migrating resource files...")
-
-        conn = sqlite3.connect(sqlite_path)
-        conn.row_factory = sqlite3.Row
+        logger.info("Migrating resource files for hub {}...", hub_id)
+        resource_ids = await self.load_resource_ids(conn, hub_id)
 
-        cursor = conn.execute("""
+        cursor = sqlite_conn.execute("""
             SELECT r.ah_id, rp.rdatapath, rp.rdataclass, rp.dispatchclass
             FROM rdatapaths rp
             JOIN resources r ON rp.resource_id = r.id
         """)
 
-        files_created = 0
-        batch = []
-        batch_size = 2000
-
-        for row in cursor:
-            hub_accession = row['ah_id']
-
-            # Find the PostgreSQL resource
-            result = await session.execute(
-                select(Resource).where(
-                    Resource.hub_id == hub_id,
-                    Resource.hub_accession == hub_accession
-                ).limit(1)
-            )
-            resource = result.scalar_one_or_none()
-
-            if resource:
-                resource_file = ResourceFile(
-                    resource_id=resource.id,
-                    file_path=row['rdatapath'],
-                    rdata_class=row['rdataclass'],
-                    dispatch_class=row['dispatchclass']
-                )
-                batch.append(resource_file)
-                files_created += 1
-
-                if len(batch) >= batch_size:
-                    session.add_all(batch)
-                    await session.flush()
-                    batch = []
-                    print(f"    Created {files_created} resource files...", end='\r')
+        files_created = await _copy_pipeline(
+            conn, cursor, ResourceFile.__tablename__, RESOURCE_FILE_COPY_COLUMNS,
+            lambda rows: [
+                (resource_ids[hub_accession], rdatapath, rdataclass, dispatchclass)
+                for hub_accession, rdatapath, rdataclass, dispatchclass in rows
+                if hub_accession in resource_ids
+            ],
+            stamp_columns=RESOURCE_FILE_STAMP_COLUMNS,
+        )
 
-        if batch:
-            session.add_all(batch)
-            await session.flush()
+        logger.info("Created {} resource files for hub {}", files_created, hub_id)
 
-        await session.commit()
-        print(f"    Created {files_created} resource files")
-
-        conn.close()
-
-    async def migrate_source_files(self, session: AsyncSession, sqlite_path: str, hub_id: int):
+    async def migrate_source_files(self, conn: asyncpg.Connection, sqlite_conn: sqlite3.Connection, hub_id: int):
         """Migrate source files (input_sources)."""
-        print("  Migrating source files...")
+        logger.info("Migrating source files for hub {}...", hub_id)
+        resource_ids = await self.load_resource_ids(conn, hub_id)
 
-        conn = sqlite3.connect(sqlite_path)
-        conn.row_factory = sqlite3.Row
-
-        cursor = conn.execute("""
+        cursor = sqlite_conn.execute("""
             SELECT r.ah_id, i.sourceurl, i.sourcetype, i.sourceversion,
                    i.sourcemd5, i.sourcesize, i.sourcelastmodifieddate
             FROM input_sources i
             JOIN resources r ON i.resource_id = r.id
         """)
 
-        files_created = 0
-        batch = []
-        batch_size = 2000
-
-        for row in cursor:
-            hub_accession = row['ah_id']
-            source_url = row['sourceurl']
-
-            # Skip if source URL is null or empty (required field)
-            if not source_url or not source_url.strip():
-                continue
-
-            # Find the PostgreSQL resource
-            result = await session.execute(
-                select(Resource).where(
-                    Resource.hub_id == hub_id,
-                    Resource.hub_accession == hub_accession
-                ).limit(1)
-            )
-            resource = result.scalar_one_or_none()
-
-            if resource:
-                source_file = SourceFile(
-                    resource_id=resource.id,
-                    source_url=source_url,
-                    source_type=row['sourcetype'],
-                    source_version=row['sourceversion'],
-                    md5_hash=row['sourcemd5'],
-                    file_size_bytes=int(row['sourcesize']) if row['sourcesize'] and row['sourcesize'].isdigit() else None,
-                    last_modified_date=datetime.fromisoformat(row['sourcelastmodifieddate']) if row['sourcelastmodifieddate'] else None
-                )
-                batch.append(source_file)
-                files_created += 1
-
-                if len(batch) >= batch_size:
-                    session.add_all(batch)
-                    await session.flush()
-                    batch = []
-                    print(f"    Created {files_created} source files...", end='\r')
-
-        if batch:
-            session.add_all(batch)
-            await session.flush()
-
-        await session.commit()
-        print(f"    Created {files_created} source files")
-
-        conn.close()
-
-    async def migrate_bioc_versions(self, session: AsyncSession, sqlite_path: str, hub_id: int):
+        def build_batch(rows):
+            batch = []
+            for row in rows:
+                source_url = row['sourceurl']
+
+                # Skip if source URL is null or empty (required field)
+                if not source_url or not source_url.strip():
+                    continue
+
+                resource_id = resource_ids.get(row['ah_id'])
+
+                if resource_id:
+                    batch.append((
+                        resource_id,
+                        source_url,
+                        row['sourcetype'],
+                        row['sourceversion'],
+                        row['sourcemd5'],
+                        int(row['sourcesize']) if row['sourcesize'] and row['sourcesize'].isdigit() else None,
+                        datetime.fromisoformat(row['sourcelastmodifieddate']) if row['sourcelastmodifieddate'] else None,
+                    ))
+            return batch
+
+        files_created = await _copy_pipeline(
+            conn, cursor, SourceFile.__tablename__, SOURCE_FILE_COPY_COLUMNS, build_batch,
+            stamp_columns=SOURCE_FILE_STAMP_COLUMNS,
+        )
+
+        logger.info("Created {} source files for hub {}", files_created, hub_id)
+
+    async def migrate_bioc_versions(self, conn: asyncpg.Connection, sqlite_conn: sqlite3.Connection, hub_id: int):
         """Migrate Bioconductor version associations."""
-        print("  Migrating Bioc version associations...")
-
-        conn = sqlite3.connect(sqlite_path)
-        conn.row_factory = sqlite3.Row
+        logger.info("Migrating Bioc version associations for hub {}...", hub_id)
+        resource_ids = await self.load_resource_ids(conn, hub_id)
 
-        cursor = conn.execute("""
+        cursor = sqlite_conn.execute("""
             SELECT r.ah_id, b.biocversion
             FROM biocversions b
             JOIN resources r ON b.resource_id = r.id
         """)
 
-        associations_created = 0
-        batch = []
-        batch_size = 5000
+        release_ids = self.bioc_release_cache
 
-        for row in cursor:
-            hub_accession = row['ah_id']
-            bioc_version = row['biocversion']
+        associations_created = await _copy_pipeline(
+            conn, cursor, ResourceBiocVersion.__tablename__, RESOURCE_BIOC_COPY_COLUMNS,
+            lambda rows: [
+                (resource_ids[hub_accession], release_ids[bioc_version])
+                for hub_accession, bioc_version in rows
+                if hub_accession in resource_ids and bioc_version in release_ids
+            ],
+            stamp_columns=RESOURCE_BIOC_STAMP_COLUMNS,
+        )
 
-            if bioc_version in self.bioc_release_cache:
-                # Find the PostgreSQL resource
-                result = await session.execute(
-                    select(Resource).where(
-                        Resource.hub_id == hub_id,
-                        Resource.hub_accession == hub_accession
-                    ).limit(1)
-                )
-                resource = result.scalar_one_or_none()
+        logger.info("Created {} bioc version associations for hub {}", associations_created, hub_id)
 
-                if resource:
-                    resource_bioc = ResourceBiocVersion(
-                        resource_id=resource.id,
-                        bioc_release_id=self.bioc_release_cache[bioc_version]
-                    )
-                    batch.append(resource_bioc)
-                    associations_created += 1
+    async def drop_bulk_load_indexes(self, session: AsyncSession):
+        """Drop the BULK_LOAD_INDEXES so COPY does not maintain them row by row."""
+        for index in BULK_LOAD_INDEXES:
+            await session.execute(DropIndex(index, if_exists=True))
+        await session.commit()
+
+    async def create_bulk_load_indexes(self, session: AsyncSession):
+        """Recreate the BULK_LOAD_INDEXES from the model definitions."""
+        # Give the rebuild sort memory and parallel workers for this transaction only
+        for name, value in INDEX_BUILD_SETTINGS.items():
+            await session.execute(text("SELECT set_config(:name, :value, true)"), {"name": name, "value": value})
+        for index in BULK_LOAD_INDEXES:
+            try:
+                await session.execute(CreateIndex(index, if_not_exists=True))
+            except Exception as e:
+                # The failure rolls back every rebuild so far; name the culprit
+                logger.error(f"Rebuilding index {index.name} on {index.table.name} failed: {e}")
+                raise
+        await session.commit()
+
+    async def migrate_hub(
+        self,
+        pool: asyncpg.Pool,
+        sqlite_conn: sqlite3.Connection,
+        hub_name: str,
+        hub_id: int,
+        recipe_id_map: Dict[int, int],
+        storage_id_map: Dict[int, int]
+    ) -> int:
+        """
+        Migrate one hub's resources and related data in a single transaction.
 
-                    if len(batch) >= batch_size:
-                        session.add_all(batch)
-                        await session.flush()
-                        batch = []
-                        print(f"    Created {associations_created} bioc associations...", end='\r')
+        The bulk phases only COPY, so they run on a raw asyncpg connection
+        rather than a SQLAlchemy session. The load is restartable from
+        scratch, so the transaction commits without waiting for the WAL
+        flush; one commit per hub keeps a crash from losing more than the
+        hub in flight.
+        """
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute("SET LOCAL synchronous_commit = OFF")
 
-        if batch:
-            session.add_all(batch)
-            await session.flush()
+                resources_created = await self.migrate_hub_resources(
+                    conn, sqlite_conn, hub_name, hub_id, recipe_id_map, storage_id_map
+                )
 
-        await session.commit()
-        print(f"    Created {associations_created} bioc version associations")
+                logger.info("Migrating {} related data...", hub_name)
+                await self.migrate_tags(conn, sqlite_conn, hub_id)
+                await self.migrate_resource_files(conn, sqlite_conn, hub_id, storage_id_map)
+                await self.migrate_source_files(conn, sqlite_conn, hub_id)
+                await self.migrate_bioc_versions(conn, sqlite_conn, hub_id)
 
-        conn.close()
+        return resources_created
 
     async def run_migration(self):
         """Run the full migration process."""
-        print("Starting migration from SQLite to PostgreSQL...\n")
+        logger.info("Starting migration from SQLite to PostgreSQL...")
 
         engine = create_async_engine(self.postgres_url)
-        async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
-
-        async with async_session() as session:
-            # Load existing caches
-            print("Loading existing data...")
-            await self.load_caches(session)
-
-            # Connect to AnnotationHub SQLite
-            print("\nExtracting entities from AnnotationHub...")
-            ah_conn = sqlite3.connect(self.sqlite_ah_path)
-
-            await self.extract_and_create_species(session, ah_conn)
-            await self.extract_and_create_genomes(session, ah_conn)
-            await self.extract_and_create_providers(session, ah_conn)
-            await self.extract_and_create_users(session, ah_conn)
-            recipe_id_map = await self.extract_and_create_recipes(session, ah_conn)
-            storage_id_map = await self.extract_and_create_storage_locations(session, ah_conn)
+        async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False, autoflush=False)
+
+        # Each SQLite file is opened once and shared by every extract/migrate step
+        ah_conn = open_sqlite(self.sqlite_ah_path)
+        eh_conn = open_sqlite(self.sqlite_eh_path)
+
+        try:
+            async with async_session() as session:
+                # Load existing caches
+                logger.info("Loading existing data...")
+                await self.check_hub_ids(session)
+                await self.load_caches(session)
+
+                logger.info("Extracting entities from AnnotationHub and ExperimentHub...")
+                (recipe_id_map, eh_recipe_map), (storage_id_map, eh_storage_map) = await self.extract_entities(
+                    async_session, [ah_conn, eh_conn]
+                )
 
+                logger.info("Dropping secondary indexes for the bulk load...")
+                await self.drop_bulk_load_indexes(session)
+
+            try:
+                # The hubs touch disjoint resource rows, so each loads concurrently
+                # on its own pooled connection and SQLite file
+                async with asyncpg.create_pool(
+                    self.asyncpg_dsn,
+                    min_size=2,
+                    max_size=2,
+                    command_timeout=BULK_COMMAND_TIMEOUT,
+                ) as pool:
+                    ah_count, eh_count = await asyncio.gather(
+                        self.migrate_hub(pool, ah_conn, "AnnotationHub", HUB_AH_ID, recipe_id_map, storage_id_map),
+                        self.migrate_hub(pool, eh_conn, "ExperimentHub", HUB_EH_ID, eh_recipe_map, eh_storage_map),
+                    )
+            finally:
+                # Rebuild even after a failed load
+                logger.info("Rebuilding secondary indexes...")
+                async with async_session() as session:
+                    await self.create_bulk_load_indexes(session)
+        finally:
             ah_conn.close()
-
-            # Also extract from ExperimentHub
-            print("\nExtracting entities from ExperimentHub...")
-            eh_conn = sqlite3.connect(self.sqlite_eh_path)
-
-            await self.extract_and_create_species(session, eh_conn)
-            await self.extract_and_create_genomes(session, eh_conn)
-            await self.extract_and_create_providers(session, eh_conn)
-            await self.extract_and_create_users(session, eh_conn)
-            eh_recipe_map = await self.extract_and_create_recipes(session, eh_conn)
-            eh_storage_map = await self.extract_and_create_storage_locations(session, eh_conn)
-
             eh_conn.close()
 
-            # Migrate resources
-            ah_count = await self.migrate_hub_resources(
-                session, self.sqlite_ah_path, "AnnotationHub", 1, recipe_id_map, storage_id_map
-            )
-            eh_count = await self.migrate_hub_resources(
-                session, self.sqlite_eh_path, "ExperimentHub", 2, eh_recipe_map, eh_storage_map
-            )
-
-            # Migrate related data for AnnotationHub
-            print("\nMigrating AnnotationHub related data...")
-            await self.migrate_tags(session, self.sqlite_ah_path, 1)
-            await self.migrate_resource_files(session, self.sqlite_ah_path, 1, storage_id_map)
-            await self.migrate_source_files(session, self.sqlite_ah_path, 1)
-            await self.migrate_bioc_versions(session, self.sqlite_ah_path, 1)
-
-            # Migrate related data for ExperimentHub
-            print("\nMigrating ExperimentHub related data...")
-            await self.migrate_tags(session, self.sqlite_eh_path, 2)
-            await self.migrate_resource_files(session, self.sqlite_eh_path, 2, eh_storage_map)
-            await self.migrate_source_files(session, self.sqlite_eh_path, 2)
-            await self.migrate_bioc_versions(session, self.sqlite_eh_path, 2)
-
         await engine.dispose()
 
-        print(f"\n{'='*60}")
-        print("Migration completed successfully!")
-        print(f"{'='*60}")
-        print(f"Total resources migrated: {ah_count + eh_count}")
-        print(f"  AnnotationHub: {ah_count}")
-        print(f"  ExperimentHub: {eh_count}")
-        print("\nEntity counts:")
-        print(f"  Species: {len(self.species_cache)}")
-        print(f"  Genomes: {len(self.genome_cache)}")
-        print(f"  Data Providers: {len(self.provider_cache)}")
-        print(f"  Users: {len(self.user_cache)}")
-        print(f"  Recipes: {len(self.recipe_cache)}")
-        print(f"  Storage Locations: {len(self.storage_cache)}")
-        print(f"  Tags: {len(self.tag_cache)}")
+        logger.info(
+            "Migration completed successfully: {} resources ({} AnnotationHub, {} ExperimentHub)",
+            ah_count + eh_count, ah_count, eh_count,
+        )
+        logger.info(
+            "Entity counts: {} species, {} genomes, {} data providers, {} users, "
+            "{} recipes, {} storage locations, {} tags",
+            len(self.species_cache), len(self.genome_cache), len(self.provider_cache),
+            len(self.user_cache), len(self.recipe_cache), len(self.storage_cache), len(self.tag_cache),
+        )
 
 
 async def migrate_sqlite_to_postgres(
@@ -861,7 +925,10 @@ async def migrate_sqlite_to_postgres(
 
 
 if __name__ == "__main__":
-    import os
+    import sys
+
+    logger.remove()
+    logger.add(sys.stderr, level="INFO", format="{time:YYYY-MM-DD HH:mm:ss} {message}")
 
     async def main():
         postgres_url = os.getenv("POSTGRES_URI", "postgresql://localhost/hubs_dev")
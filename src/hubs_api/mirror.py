@@ -1,14 +1,15 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
 import duckdb
 import httpx
-import pathlib
-import datetime
+import time
 from loguru import logger
 from dotenv import load_dotenv
 
 load_dotenv()
 
 AH_SQLITE_URL = "https://annotationhub.bioconductor.org/metadata/annotationhub.sqlite3"
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
 
 
 def get_duckdb_connection():
@@ -17,6 +18,15 @@ def get_duckdb_connection():
     return conn
 
 
+def configure_bulk_copy(conn):
+    # Let DuckDB pipeline partitions out of order and use every core for bulk copies
+    conn.execute("SET preserve_insertion_order=false")
+    conn.execute(f"SET threads={os.cpu_count() or 1}")
+    memory_limit = os.environ.get("DUCKDB_MEMORY_LIMIT")
+    if memory_limit:
+        conn.execute(f"SET memory_limit='{memory_limit}'")
+
+
 def attach_extension(conn, extension_name):
     # Attach the specified extension to the DuckDB connection
     conn.execute(f"INSTALL {extension_name}")
@@ -24,13 +34,12 @@ def attach_extension(conn, extension_name):
 
 
 def is_file_recent(file_path, max_age_days=2):
-    # Check if file exists and is less than max_age_days old
-    path = pathlib.Path(file_path)
-    if not path.exists():
+    # Check if file exists and is less than max_age_days old (a single stat call)
+    try:
+        st = os.stat(file_path)
+    except FileNotFoundError:
         return False
-
-    file_age = datetime.datetime.now() - datetime.datetime.fromtimestamp(path.stat().st_mtime)
-    return file_age < datetime.timedelta(days=max_age_days)
+    return (time.time() - st.st_mtime) < max_age_days * 86400
 
 
 def get_ah_sqlite_file(url, output_file):
@@ -41,11 +50,16 @@ def get_ah_sqlite_file(url, output_file):
     with httpx.Client() as client:
         with client.stream("GET", url) as response:
             response.raise_for_status()
-            with open(output_file, "wb") as f:
-                for chunk in response.iter_bytes():
+            with open(output_file, "wb", buffering=DOWNLOAD_CHUNK_SIZE) as f:
+                for chunk in response.iter_bytes(chunk_size=DOWNLOAD_CHUNK_SIZE):
                     f.write(chunk)
 
 
+def attach_ah_sqlite_database(conn: duckdb.DuckDBPyConnection, local_file: str, alias: str):
+    # Attach the local SQLite copy read-only; the copy workers only read from it
+    conn.execute(f"ATTACH DATABASE '{local_file}' AS {alias} (TYPE SQLITE, READ_ONLY)")
+
+
 def attach_postgres_database(conn: duckdb.DuckDBPyConnection, uri: str, alias: str):
     # Attach a PostgreSQL database using the provided URI and alias
     conn.execute(f"ATTACH DATABASE '{uri}' AS {alias} (type POSTGRES);")
@@ -63,25 +77,56 @@ def copy_single_table(
     conn.execute(f"""
         DROP TABLE IF EXISTS {target_alias}.{target_table_name};
     """)
+    # The postgres extension already loads CTAS over the binary COPY protocol
     conn.execute(f"""
         CREATE TABLE {target_alias}.{target_table_name} 
         AS SELECT * FROM {source_alias}.{table_name};
     """)
 
 
-def main():
+def _copy_table_worker(conn: duckdb.DuckDBPyConnection, table_name: str):
+    # Each worker gets its own cursor; attached databases are shared across cursors
+    cursor = conn.cursor()
+    try:
+        logger.info(f"Copying table {table_name} from SQLite to PostgreSQL...")
+        copy_single_table(cursor, "ah_sqlite", table_name, 'ah_postgres', table_name)
+    finally:
+        cursor.close()
+
+
+# Indexes backing the /resources filters; the mirror recreates the table each run
+RESOURCE_INDEX_STATEMENTS = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS resources_title_trgm ON public.resources USING gin (title gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS resources_description_trgm ON public.resources USING gin (description gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS resources_species_idx ON public.resources (species)",
+    "CREATE INDEX IF NOT EXISTS resources_genome_idx ON public.resources (genome)",
+    "CREATE INDEX IF NOT EXISTS resources_dataprovider_idx ON public.resources (dataprovider)",
+    "CREATE INDEX IF NOT EXISTS resources_taxonomyid_idx ON public.resources (taxonomyid)",
+    "CREATE INDEX IF NOT EXISTS resources_rdatadateadded_idx ON public.resources (rdatadateadded)",
+)
+
+
+def create_resource_indexes(conn: duckdb.DuckDBPyConnection, alias: str):
+    # Run the index DDL directly on the attached Postgres database
+    for statement in RESOURCE_INDEX_STATEMENTS:
+        conn.execute("CALL postgres_execute(?, ?)", [alias, statement])
+
+
+def main(max_workers: int = 4):
     conn = get_duckdb_connection()
+    configure_bulk_copy(conn)
 
     # Attach the HTTP extension
     attach_extension(conn, 'sqlite3')
     attach_extension(conn, 'postgres')
 
-    # Download the SQLite file from the URL
+    # Download the SQLite file from the URL (skipped while the local copy is recent)
     sqlite_file = "annotationhub.sqlite3"
     get_ah_sqlite_file(AH_SQLITE_URL, sqlite_file)
 
     # Attach the SQLite database
-    conn.execute(f"ATTACH DATABASE '{sqlite_file}' AS ah_sqlite")
+    attach_ah_sqlite_database(conn, sqlite_file, "ah_sqlite")
     df = conn.sql("""
         SELECT table_name 
         FROM information_schema.tables 
@@ -96,18 +141,23 @@ def main():
 
     attach_postgres_database(conn, postgres_uri, "ah_postgres")
 
-    # loop over tables in the SQLite database and copy them to DuckDB
-    for row in df.iter_rows():
-        table_name = row[0]
-        logger.info(f"Copying table {table_name} from SQLite to PostgreSQL...")
-        copy_single_table(conn, "ah_sqlite", table_name, 'ah_postgres', table_name)
+    # copy tables concurrently so network round-trips to Postgres overlap
+    table_names = [row[0] for row in df.iter_rows()]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_copy_table_worker, conn, name) for name in table_names]
+        for future in futures:
+            future.result()
 
     logger.info("All tables copied successfully.")
 
+    logger.info("Creating indexes on resources...")
+    create_resource_indexes(conn, "ah_postgres")
+
 
 def dump_postgresql_schema_from_duckdb(schema_file: str = "postgres_schema.csv"):
     # Dump the PostgreSQL schema from DuckDB to a SQL file
     conn = get_duckdb_connection()
+    configure_bulk_copy(conn)
     attach_extension(conn, 'postgres')
 
     # Read Postgres URI from environment variable POSTGRES_URI
@@ -118,12 +168,13 @@ def dump_postgresql_schema_from_duckdb(schema_file: str = "postgres_schema.csv")
 
     attach_postgres_database(conn, postgres_uri, "ah_postgres")
 
-    # Get the schema creation statements
-    result = conn.execute("""
-        SELECT *
-        FROM information_schema.columns
-        WHERE table_catalog = 'ah_postgres'
-    """).pl()
-
-    result.write_csv(schema_file)
+    # Write the column metadata straight to CSV from DuckDB
+    escaped_file = schema_file.replace("'", "''")
+    conn.execute(f"""
+        COPY (
+            SELECT *
+            FROM information_schema.columns
+            WHERE table_catalog = 'ah_postgres'
+        ) TO '{escaped_file}' (HEADER, DELIMITER ',')
+    """)
     logger.info(f"PostgreSQL schema dumped to {schema_file}")
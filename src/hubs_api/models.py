@@ -5,27 +5,37 @@ This module defines the normalized schema for AnnotationHub and ExperimentHub,
 including proper entity relationships, temporal versioning, and audit trails.
 """
 
+import uuid
 from datetime import datetime, date
-from typing import Optional, List
+from functools import partial
+from ipaddress import IPv4Address, IPv6Address
+from typing import Optional, List, Union
 from sqlalchemy import (
     BigInteger,
     Boolean,
-    Column,
     Date,
     DateTime,
+    Enum,
     ForeignKey,
     Index,
     Integer,
+    SmallInteger,
     String,
     Text,
     CheckConstraint,
     UniqueConstraint,
+    text,
 )
-from sqlalchemy.dialects.postgresql import INET, JSONB, UUID, ARRAY
-from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
+from sqlalchemy.dialects.postgresql import INET, JSONB, UUID
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, query_expression, relationship
 from sqlalchemy.sql import func
 
 
+# Relationships never load implicitly: queries opt in with selectinload/joinedload,
+# and an attribute access that would emit SQL raises instead
+_relationship = partial(relationship, lazy="raise_on_sql")
+
+
 class Base(DeclarativeBase):
     """Base class for all ORM models."""
     pass
@@ -40,7 +50,7 @@ class Organization(Base):
     __tablename__ = "organizations"
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
-    name: Mapped[str] = mapped_column(String(500), nullable=False)
+    name: Mapped[str] = mapped_column(Text, nullable=False)
     short_name: Mapped[Optional[str]] = mapped_column(String(100), unique=True)
     website: Mapped[Optional[str]] = mapped_column(Text)
     ror_id: Mapped[Optional[str]] = mapped_column(String(50), unique=True)  # Research Organization Registry
@@ -49,8 +59,8 @@ class Organization(Base):
     meta: Mapped[Optional[dict]] = mapped_column(JSONB)
 
     # Relationships
-    users: Mapped[List["User"]] = relationship(back_populates="organization")
-    data_providers: Mapped[List["DataProvider"]] = relationship(back_populates="organization")
+    users: Mapped[List["User"]] = _relationship(back_populates="organization")
+    data_providers: Mapped[List["DataProvider"]] = _relationship(back_populates="organization")
 
     def __repr__(self) -> str:
         return f"<Organization(id={self.id}, name='{self.name}')>"
@@ -74,28 +84,33 @@ class User(Base):
     meta: Mapped[Optional[dict]] = mapped_column(JSONB)
 
     # Relationships
-    organization: Mapped[Optional["Organization"]] = relationship(back_populates="users")
-    maintained_resources: Mapped[List["Resource"]] = relationship(
+    organization: Mapped[Optional["Organization"]] = _relationship(back_populates="users")
+    maintained_resources: Mapped[List["Resource"]] = _relationship(
         back_populates="maintainer",
         foreign_keys="Resource.maintainer_id"
     )
-    created_resources: Mapped[List["Resource"]] = relationship(
+    created_resources: Mapped[List["Resource"]] = _relationship(
         back_populates="created_by_user",
-        foreign_keys="Resource.created_by"
+        foreign_keys="Resource.created_by",
+        viewonly=True
     )
-    updated_resources: Mapped[List["Resource"]] = relationship(
+    updated_resources: Mapped[List["Resource"]] = _relationship(
         back_populates="updated_by_user",
-        foreign_keys="Resource.updated_by"
+        foreign_keys="Resource.updated_by",
+        viewonly=True
     )
-    deleted_resources: Mapped[List["Resource"]] = relationship(
+    deleted_resources: Mapped[List["Resource"]] = _relationship(
         back_populates="deleted_by_user",
-        foreign_keys="Resource.deleted_by"
+        foreign_keys="Resource.deleted_by",
+        viewonly=True
     )
 
     __table_args__ = (
         Index("idx_users_email", "email"),
-        Index("idx_users_orcid", "orcid", postgresql_where=Column("orcid").isnot(None)),
+        Index("idx_users_orcid", "orcid", postgresql_where=text("orcid IS NOT NULL")),
         Index("idx_users_org", "organization_id"),
+        # Latest-change lookups for list ETags read the index endpoint
+        Index("idx_users_updated", "updated_at"),
     )
 
     def __repr__(self) -> str:
@@ -119,12 +134,14 @@ class Species(Base):
     meta: Mapped[Optional[dict]] = mapped_column(JSONB)
 
     # Relationships
-    genomes: Mapped[List["Genome"]] = relationship(back_populates="species")
-    resources: Mapped[List["Resource"]] = relationship(back_populates="species")
+    genomes: Mapped[List["Genome"]] = _relationship(back_populates="species")
+    resources: Mapped[List["Resource"]] = _relationship(back_populates="species")
 
     __table_args__ = (
         Index("idx_species_taxonomy", "taxonomy_id"),
         Index("idx_species_scientific", "scientific_name"),
+        Index("idx_species_scientific_trgm", "scientific_name", postgresql_using="gin", postgresql_ops={"scientific_name": "gin_trgm_ops"}),
+        Index("idx_species_common_trgm", "common_name", postgresql_using="gin", postgresql_ops={"common_name": "gin_trgm_ops"}),
     )
 
     def __repr__(self) -> str:
@@ -147,13 +164,14 @@ class Genome(Base):
     meta: Mapped[Optional[dict]] = mapped_column(JSONB)
 
     # Relationships
-    species: Mapped["Species"] = relationship(back_populates="genomes")
-    resources: Mapped[List["Resource"]] = relationship(back_populates="genome")
+    species: Mapped["Species"] = _relationship(back_populates="genomes")
+    resources: Mapped[List["Resource"]] = _relationship(back_populates="genome")
 
     __table_args__ = (
         UniqueConstraint("species_id", "genome_build", name="uq_species_genome_build"),
         Index("idx_genomes_species", "species_id"),
         Index("idx_genomes_build", "genome_build"),
+        Index("idx_genomes_build_trgm", "genome_build", postgresql_using="gin", postgresql_ops={"genome_build": "gin_trgm_ops"}),
     )
 
     def __repr__(self) -> str:
@@ -179,11 +197,14 @@ class DataProvider(Base):
     meta: Mapped[Optional[dict]] = mapped_column(JSONB)
 
     # Relationships
-    organization: Mapped[Optional["Organization"]] = relationship(back_populates="data_providers")
-    resources: Mapped[List["Resource"]] = relationship(back_populates="data_provider")
+    organization: Mapped[Optional["Organization"]] = _relationship(back_populates="data_providers")
+    resources: Mapped[List["Resource"]] = _relationship(back_populates="data_provider")
 
     __table_args__ = (
         Index("idx_providers_org", "organization_id"),
+        # Latest-change lookups for list ETags read the index endpoint
+        Index("idx_providers_updated", "updated_at"),
+        Index("idx_providers_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
     )
 
     def __repr__(self) -> str:
@@ -206,10 +227,12 @@ class Recipe(Base):
     meta: Mapped[Optional[dict]] = mapped_column(JSONB)
 
     # Relationships
-    resources: Mapped[List["Resource"]] = relationship(back_populates="recipe")
+    resources: Mapped[List["Resource"]] = _relationship(back_populates="recipe")
 
     __table_args__ = (
         Index("idx_recipes_package", "package_name"),
+        # Latest-change lookups for list ETags read the index endpoint
+        Index("idx_recipes_updated", "updated_at"),
     )
 
     def __repr__(self) -> str:
@@ -231,7 +254,7 @@ class Hub(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
-    resources: Mapped[List["Resource"]] = relationship(back_populates="hub")
+    resources: Mapped[List["Resource"]] = _relationship(back_populates="hub")
 
     def __repr__(self) -> str:
         return f"<Hub(id={self.id}, name='{self.name}', code='{self.code}')>"
@@ -249,7 +272,7 @@ class ResourceStatus(Base):
     sort_order: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
 
     # Relationships
-    resources: Mapped[List["Resource"]] = relationship(back_populates="status")
+    resources: Mapped[List["Resource"]] = _relationship(back_populates="status")
 
     def __repr__(self) -> str:
         return f"<ResourceStatus(id={self.id}, status='{self.status}', public={self.is_public})>"
@@ -268,7 +291,7 @@ class Resource(Base):
     hub_accession: Mapped[str] = mapped_column(String(50), nullable=False)
 
     # Core metadata
-    title: Mapped[str] = mapped_column(String(1000), nullable=False)
+    title: Mapped[str] = mapped_column(Text, nullable=False)
     description: Mapped[Optional[str]] = mapped_column(Text)
 
     # Taxonomy & genome
@@ -301,51 +324,70 @@ class Resource(Base):
     # Extensibility
     meta: Mapped[Optional[dict]] = mapped_column(JSONB)
 
+    # File counts, populated per query with with_expression()
+    num_resource_files: Mapped[Optional[int]] = query_expression()
+    num_source_files: Mapped[Optional[int]] = query_expression()
+
     # Relationships
-    hub: Mapped["Hub"] = relationship(back_populates="resources")
-    species: Mapped[Optional["Species"]] = relationship(back_populates="resources")
-    genome: Mapped[Optional["Genome"]] = relationship(back_populates="resources")
-    data_provider: Mapped[Optional["DataProvider"]] = relationship(back_populates="resources")
-    recipe: Mapped[Optional["Recipe"]] = relationship(back_populates="resources")
-    maintainer: Mapped[Optional["User"]] = relationship(
+    hub: Mapped["Hub"] = _relationship(back_populates="resources")
+    species: Mapped[Optional["Species"]] = _relationship(back_populates="resources")
+    genome: Mapped[Optional["Genome"]] = _relationship(back_populates="resources")
+    data_provider: Mapped[Optional["DataProvider"]] = _relationship(back_populates="resources")
+    recipe: Mapped[Optional["Recipe"]] = _relationship(back_populates="resources")
+    maintainer: Mapped[Optional["User"]] = _relationship(
         back_populates="maintained_resources",
         foreign_keys=[maintainer_id]
     )
-    status: Mapped["ResourceStatus"] = relationship(back_populates="resources")
+    status: Mapped["ResourceStatus"] = _relationship(back_populates="resources")
 
-    # Audit relationships
-    created_by_user: Mapped[Optional["User"]] = relationship(
+    # Audit relationships are read-only; write the *_by columns directly
+    created_by_user: Mapped[Optional["User"]] = _relationship(
         back_populates="created_resources",
-        foreign_keys=[created_by]
+        foreign_keys=[created_by],
+        viewonly=True
     )
-    updated_by_user: Mapped[Optional["User"]] = relationship(
+    updated_by_user: Mapped[Optional["User"]] = _relationship(
         back_populates="updated_resources",
-        foreign_keys=[updated_by]
+        foreign_keys=[updated_by],
+        viewonly=True
     )
-    deleted_by_user: Mapped[Optional["User"]] = relationship(
+    deleted_by_user: Mapped[Optional["User"]] = _relationship(
         back_populates="deleted_resources",
-        foreign_keys=[deleted_by]
+        foreign_keys=[deleted_by],
+        viewonly=True
     )
 
     # Child relationships
-    resource_files: Mapped[List["ResourceFile"]] = relationship(back_populates="resource", cascade="all, delete-orphan")
-    source_files: Mapped[List["SourceFile"]] = relationship(back_populates="resource", cascade="all, delete-orphan")
-    tags: Mapped[List["ResourceTag"]] = relationship(back_populates="resource", cascade="all, delete-orphan")
-    bioc_versions: Mapped[List["ResourceBiocVersion"]] = relationship(back_populates="resource", cascade="all, delete-orphan")
+    resource_files: Mapped[List["ResourceFile"]] = _relationship(back_populates="resource", cascade="all, delete-orphan")
+    source_files: Mapped[List["SourceFile"]] = _relationship(back_populates="resource", cascade="all, delete-orphan")
+    tags: Mapped[List["ResourceTag"]] = _relationship(back_populates="resource", cascade="all, delete-orphan")
+    bioc_versions: Mapped[List["ResourceBiocVersion"]] = _relationship(back_populates="resource", cascade="all, delete-orphan")
 
     __table_args__ = (
         UniqueConstraint("hub_id", "hub_accession", "version_number", name="uq_hub_accession_version"),
         CheckConstraint("valid_to IS NULL OR valid_to > valid_from", name="chk_valid_dates"),
         Index("idx_resources_hub_accession", "hub_id", "hub_accession"),
         Index("idx_resources_status", "status_id"),
-        Index("idx_resources_species", "species_id"),
-        Index("idx_resources_genome", "genome_id"),
-        Index("idx_resources_provider", "data_provider_id"),
-        Index("idx_resources_maintainer", "maintainer_id"),
-        Index("idx_resources_valid_from", "valid_from"),
-        Index("idx_resources_valid_to", "valid_to", postgresql_where=Column("valid_to").isnot(None)),
-        Index("idx_resources_current", "id", postgresql_where=(Column("valid_to").is_(None) & Column("deleted_at").is_(None))),
-        Index("idx_resources_deleted", "deleted_at", postgresql_where=Column("deleted_at").isnot(None)),
+        # FK filters carry the accession so accession lookups by FK can be
+        # answered from the index alone
+        Index("idx_resources_species", "species_id", postgresql_include=["hub_id", "hub_accession"]),
+        Index("idx_resources_genome", "genome_id", postgresql_include=["hub_id", "hub_accession"]),
+        Index("idx_resources_provider", "data_provider_id", postgresql_include=["hub_id", "hub_accession"]),
+        Index("idx_resources_maintainer", "maintainer_id", postgresql_include=["hub_id", "hub_accession"]),
+        # Rows are appended roughly in valid_from order, so block-range
+        # summaries serve temporal range scans at a fraction of a btree's size
+        Index("idx_resources_valid_from_brin", "valid_from", postgresql_using="brin", postgresql_with={"pages_per_range": 32}),
+        Index("idx_resources_created_id", "created_at", "id"),
+        Index("idx_resources_valid_to", "valid_to", postgresql_where=text("valid_to IS NOT NULL")),
+        Index("idx_resources_current", "id", postgresql_where=text("valid_to IS NULL AND deleted_at IS NULL")),
+        Index("idx_resources_deleted", "deleted_at", postgresql_where=text("deleted_at IS NOT NULL")),
+        # Live-row listing: match the default "deleted_at IS NULL" filter and
+        # the (created_at, id) DESC keyset order
+        Index("idx_resources_live", text("created_at DESC"), text("id DESC"), postgresql_where=text("deleted_at IS NULL")),
+        Index("idx_resources_live_hub", "hub_id", text("created_at DESC"), postgresql_where=text("deleted_at IS NULL")),
+        Index("idx_resources_live_species", "species_id", text("created_at DESC"), postgresql_where=text("deleted_at IS NULL")),
+        Index("idx_resources_title_trgm", "title", postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}),
+        Index("idx_resources_description_trgm", "description", postgresql_using="gin", postgresql_ops={"description": "gin_trgm_ops"}),
     )
 
     def __repr__(self) -> str:
@@ -370,7 +412,7 @@ class StorageLocation(Base):
     meta: Mapped[Optional[dict]] = mapped_column(JSONB)
 
     # Relationships
-    resource_files: Mapped[List["ResourceFile"]] = relationship(back_populates="storage_location")
+    resource_files: Mapped[List["ResourceFile"]] = _relationship(back_populates="storage_location")
 
     def __repr__(self) -> str:
         return f"<StorageLocation(id={self.id}, name='{self.name}', type='{self.location_type}')>"
@@ -385,7 +427,7 @@ class ResourceFile(Base):
     storage_location_id: Mapped[Optional[int]] = mapped_column(BigInteger, ForeignKey("storage_locations.id"))
 
     # File metadata
-    file_path: Mapped[str] = mapped_column(String(2000), nullable=False)
+    file_path: Mapped[str] = mapped_column(Text, nullable=False)
     file_size_bytes: Mapped[Optional[int]] = mapped_column(BigInteger)
     file_type: Mapped[Optional[str]] = mapped_column(String(100))
 
@@ -405,15 +447,17 @@ class ResourceFile(Base):
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     # Relationships
-    resource: Mapped["Resource"] = relationship(back_populates="resource_files")
-    storage_location: Mapped[Optional["StorageLocation"]] = relationship(back_populates="resource_files")
+    resource: Mapped["Resource"] = _relationship(back_populates="resource_files")
+    storage_location: Mapped[Optional["StorageLocation"]] = _relationship(back_populates="resource_files")
 
     __table_args__ = (
         UniqueConstraint("resource_id", "file_path", "valid_from", name="uq_resource_file_path_valid"),
         Index("idx_resource_files_resource", "resource_id"),
         Index("idx_resource_files_storage", "storage_location_id"),
         Index("idx_resource_files_type", "file_type"),
-        Index("idx_resource_files_current", "resource_id", postgresql_where=Column("valid_to").is_(None)),
+        # Latest-change lookups for list ETags read the index endpoint
+        Index("idx_resource_files_updated", "updated_at"),
+        Index("idx_resource_files_current", "resource_id", postgresql_where=text("valid_to IS NULL")),
     )
 
     def __repr__(self) -> str:
@@ -428,7 +472,7 @@ class SourceFile(Base):
     resource_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("resources.id", ondelete="CASCADE"), nullable=False)
 
     # Source location
-    source_url: Mapped[str] = mapped_column(String(2000), nullable=False)
+    source_url: Mapped[str] = mapped_column(Text, nullable=False)
     source_type: Mapped[Optional[str]] = mapped_column(String(100))
     source_version: Mapped[Optional[str]] = mapped_column(String(255))
 
@@ -444,11 +488,13 @@ class SourceFile(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
-    resource: Mapped["Resource"] = relationship(back_populates="source_files")
+    resource: Mapped["Resource"] = _relationship(back_populates="source_files")
 
     __table_args__ = (
         Index("idx_source_files_resource", "resource_id"),
         Index("idx_source_files_url", "source_url"),
+        # Latest-change lookups for list ETags read the index endpoint
+        Index("idx_source_files_created", "created_at"),
     )
 
     def __repr__(self) -> str:
@@ -470,10 +516,11 @@ class Tag(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
-    resource_tags: Mapped[List["ResourceTag"]] = relationship(back_populates="tag_obj", cascade="all, delete-orphan")
+    resource_tags: Mapped[List["ResourceTag"]] = _relationship(back_populates="tag_obj", cascade="all, delete-orphan")
 
     __table_args__ = (
         Index("idx_tags_category", "category"),
+        Index("idx_tags_tag_trgm", "tag", postgresql_using="gin", postgresql_ops={"tag": "gin_trgm_ops"}),
     )
 
     def __repr__(self) -> str:
@@ -490,12 +537,14 @@ class ResourceTag(Base):
     added_by: Mapped[Optional[int]] = mapped_column(BigInteger, ForeignKey("users.id"))
 
     # Relationships
-    resource: Mapped["Resource"] = relationship(back_populates="tags")
-    tag_obj: Mapped["Tag"] = relationship(back_populates="resource_tags")
-    added_by_user: Mapped[Optional["User"]] = relationship()
+    resource: Mapped["Resource"] = _relationship(back_populates="tags")
+    tag_obj: Mapped["Tag"] = _relationship(back_populates="resource_tags")
+    added_by_user: Mapped[Optional["User"]] = _relationship()
 
     __table_args__ = (
-        Index("idx_resource_tags_tag", "tag_id"),
+        Index("idx_resource_tags_tag", "tag_id", "resource_id"),
+        # Latest-change lookups for list ETags read the index endpoint
+        Index("idx_resource_tags_added", "added_at"),
     )
 
     def __repr__(self) -> str:
@@ -520,10 +569,10 @@ class BiocRelease(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
-    resource_versions: Mapped[List["ResourceBiocVersion"]] = relationship(back_populates="bioc_release", cascade="all, delete-orphan")
+    resource_versions: Mapped[List["ResourceBiocVersion"]] = _relationship(back_populates="bioc_release", cascade="all, delete-orphan")
 
     __table_args__ = (
-        Index("idx_bioc_releases_current", "is_current", postgresql_where=Column("is_current").is_(True)),
+        Index("idx_bioc_releases_current", "is_current", postgresql_where=text("is_current IS TRUE")),
     )
 
     def __repr__(self) -> str:
@@ -541,11 +590,13 @@ class ResourceBiocVersion(Base):
     added_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
 
     # Relationships
-    resource: Mapped["Resource"] = relationship(back_populates="bioc_versions")
-    bioc_release: Mapped["BiocRelease"] = relationship(back_populates="resource_versions")
+    resource: Mapped["Resource"] = _relationship(back_populates="bioc_versions")
+    bioc_release: Mapped["BiocRelease"] = _relationship(back_populates="resource_versions")
 
     __table_args__ = (
         Index("idx_resource_bioc_release", "bioc_release_id"),
+        # Latest-change lookups for list ETags read the index endpoint
+        Index("idx_resource_bioc_added", "added_at"),
     )
 
     def __repr__(self) -> str:
@@ -556,46 +607,78 @@ class ResourceBiocVersion(Base):
 # Audit & Provenance
 # ============================================================================
 
+class AuditTable(Base):
+    """Audited table names; audit rows reference them by a small id."""
+    __tablename__ = "audit_tables"
+
+    id: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    name: Mapped[str] = mapped_column(Text, nullable=False, unique=True)
+
+    def __repr__(self) -> str:
+        return f"<AuditTable(id={self.id}, name='{self.name}')>"
+
+
 class AuditLog(Base):
     """Complete audit trail for all CRUD operations."""
     __tablename__ = "audit_log"
 
-    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
-    table_name: Mapped[str] = mapped_column(String(100), nullable=False)
+    # Range-partitioned on performed_at, so the partition key joins the primary key
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    table_id: Mapped[int] = mapped_column(SmallInteger, ForeignKey("audit_tables.id"), nullable=False)
     record_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
-    operation: Mapped[str] = mapped_column(String(10), nullable=False)
+    operation: Mapped[str] = mapped_column(Enum("INSERT", "UPDATE", "DELETE", name="audit_operation"), nullable=False)
 
     # Who & when
     user_id: Mapped[Optional[int]] = mapped_column(BigInteger, ForeignKey("users.id"))
-    performed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    performed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True, server_default=func.now())
 
-    # What changed
-    old_values: Mapped[Optional[dict]] = mapped_column(JSONB)
-    new_values: Mapped[Optional[dict]] = mapped_column(JSONB)
-    changed_fields: Mapped[Optional[List[str]]] = mapped_column(ARRAY(Text))
+    # What changed: only the changed columns, as {column: {"o": old, "n": new}};
+    # the changed field names are its keys
+    changes: Mapped[Optional[dict]] = mapped_column(JSONB)
 
     # Why
     change_reason: Mapped[Optional[str]] = mapped_column(Text)
-    ip_address: Mapped[Optional[str]] = mapped_column(INET)
+    ip_address: Mapped[Optional[Union[IPv4Address, IPv6Address]]] = mapped_column(INET)
     user_agent: Mapped[Optional[str]] = mapped_column(Text)
 
     # Context
-    request_id: Mapped[Optional[str]] = mapped_column(UUID)
+    request_id: Mapped[Optional[uuid.UUID]] = mapped_column(UUID(as_uuid=True))
     meta: Mapped[Optional[dict]] = mapped_column(JSONB)
 
     # Relationships
-    user: Mapped[Optional["User"]] = relationship()
+    user: Mapped[Optional["User"]] = _relationship()
 
     __table_args__ = (
-        Index("idx_audit_table_record", "table_name", "record_id"),
-        Index("idx_audit_user", "user_id"),
-        Index("idx_audit_performed_at", "performed_at"),
-        Index("idx_audit_operation", "operation"),
-        Index("idx_audit_request", "request_id", postgresql_where=Column("request_id").isnot(None)),
+        # "What happened to row X" is answered from the index alone
+        Index("idx_audit_table_record", "table_id", "record_id", postgresql_include=["performed_at", "operation", "user_id"]),
+        # Serves both the user FK and "recent actions by user" (newest first)
+        Index("idx_audit_user_performed", "user_id", "performed_at"),
+        # Rows arrive in performed_at order, so block-range summaries suffice
+        Index("idx_audit_performed_at_brin", "performed_at", postgresql_using="brin"),
+        # operation has three values; only the rare deletes are worth indexing
+        Index("idx_audit_deletes", "table_id", "record_id", "performed_at", postgresql_where=text("operation = 'DELETE'")),
+        Index("idx_audit_request", "request_id", postgresql_where=text("request_id IS NOT NULL")),
+        # jsonb_path_ops serves @> containment lookups from a much smaller GIN index
+        Index("idx_audit_changes_gin", "changes", postgresql_using="gin", postgresql_ops={"changes": "jsonb_path_ops"}),
+        Index("idx_audit_meta_gin", "meta", postgresql_using="gin", postgresql_ops={"meta": "jsonb_path_ops"}),
+        # Time-bounded queries prune to the matching partitions, and retention
+        # detaches or drops whole partitions instead of deleting rows
+        {"postgresql_partition_by": "RANGE (performed_at)"},
     )
 
+    @staticmethod
+    def build_changes(before: Optional[dict], after: Optional[dict]) -> dict:
+        """Diff two row snapshots into the ``changes`` shape, keeping only differing columns."""
+        before = before or {}
+        after = after or {}
+        return {
+            column: {"o": before.get(column), "n": after.get(column)}
+            for column in before.keys() | after.keys()
+            if before.get(column) != after.get(column)
+        }
+
     def __repr__(self) -> str:
-        return f"<AuditLog(id={self.id}, table='{self.table_name}', op='{self.operation}', record_id={self.record_id})>"
+        return f"<AuditLog(id={self.id}, table_id={self.table_id}, op='{self.operation}', record_id={self.record_id})>"
 
 
 # ============================================================================
@@ -643,6 +726,7 @@ __all__ = [
     "BiocRelease",
     "ResourceBiocVersion",
     # Audit
+    "AuditTable",
     "AuditLog",
     # Legacy
     "SchemaInfo",
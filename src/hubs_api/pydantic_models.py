@@ -1,4 +1,6 @@
-from pydantic import BaseModel, Field
+from datetime import date
+
+from pydantic import BaseModel, ConfigDict, Field
 
 class HubReturnEnvelope(BaseModel):
     """Pydantic model for the return envelope of a hub."""
@@ -11,6 +13,7 @@ class HubReturnEnvelope(BaseModel):
     
 class ResourceModel(BaseModel):
     """Pydantic model for a resource."""
+    model_config = ConfigDict(from_attributes=True)
     
     id: int
     ah_id: str
@@ -25,8 +28,8 @@ class ResourceModel(BaseModel):
     status_id: int | None = None
     location_prefix_id: int | None = None
     recipe_id: int | None = None
-    rdatadateadded: str | None = None  # ISO date string
-    rdatadateremoved: str | None = None  # ISO date string
+    rdatadateadded: date | None = None  # serialized as ISO date string
+    rdatadateremoved: date | None = None  # serialized as ISO date string
     record_id: int | None = None
     preparerclass: str | None = None
     
@@ -1,7 +1,7 @@
 """Pydantic schemas for API request/response models."""
 from datetime import datetime
 from typing import Optional, List
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter, ValidationInfo, field_validator, model_validator
 
 
 # ============================================================================
@@ -143,6 +143,15 @@ class ResourceSummarySchema(BaseModel):
     provider_name: Optional[str] = None
 
 
+# Small, slow-changing lookups repeated across many rows of a list response
+_REFERENCE_SCHEMAS = {
+    "hub": HubSchema,
+    "status": ResourceStatusSchema,
+    "data_provider": DataProviderSchema,
+    "recipe": RecipeSchema,
+}
+
+
 class ResourceSchema(BaseModel):
     """Full resource information with nested entities."""
     model_config = ConfigDict(from_attributes=True)
@@ -188,6 +197,53 @@ class ResourceSchema(BaseModel):
     resource_files: Optional[List[ResourceFileSchema]] = None
     source_files: Optional[List[SourceFileSchema]] = None
 
+    # File counts (only with include_file_counts)
+    num_resource_files: Optional[int] = None
+    num_source_files: Optional[int] = None
+
+    @field_validator("hub", "status", "data_provider", "recipe", mode="before")
+    @classmethod
+    def reuse_reference_entities(cls, value, info: ValidationInfo):
+        """Validate each shared lookup row once per request (via a context cache)."""
+        cache = (info.context or {}).get("reference_cache")
+        entity_id = getattr(value, "id", None)
+        if cache is None or entity_id is None or isinstance(value, BaseModel):
+            return value
+        key = (info.field_name, entity_id)
+        schema = cache.get(key)
+        if schema is None:
+            schema = cache[key] = _REFERENCE_SCHEMAS[info.field_name].model_validate(value)
+        return schema
+
+    @field_validator("tags", mode="before")
+    @classmethod
+    def unwrap_resource_tags(cls, value):
+        """Accept ORM ResourceTag rows by reading their tag."""
+        if value is None:
+            return value
+        return [getattr(item, "tag_obj", item) for item in value]
+
+    @field_validator("bioc_versions", mode="before")
+    @classmethod
+    def unwrap_resource_bioc_versions(cls, value):
+        """Accept ORM ResourceBiocVersion rows by reading their release."""
+        if value is None:
+            return value
+        return [getattr(item, "bioc_release", item) for item in value]
+
+    @model_validator(mode="after")
+    def drop_unrequested_collections(self, info: ValidationInfo):
+        """Null out collections the caller did not ask for (via validation context)."""
+        context = info.context or {}
+        if context.get("include_tags") is False:
+            self.tags = None
+        if context.get("include_bioc_versions") is False:
+            self.bioc_versions = None
+        if context.get("include_files") is False:
+            self.resource_files = None
+            self.source_files = None
+        return self
+
 
 class ResourceDetailSchema(ResourceSchema):
     """Extended resource with all related data."""
@@ -205,12 +261,13 @@ class ResourceDetailSchema(ResourceSchema):
 
 class PaginationMeta(BaseModel):
     """Pagination metadata."""
-    total: int = Field(..., description="Total number of records matching filters")
+    total: Optional[int] = Field(None, description="Total number of records matching filters (only when include_total=true)")
     limit: int = Field(..., description="Maximum records returned per page")
     offset: int = Field(..., description="Number of records skipped")
     count: int = Field(..., description="Number of records in this response")
     has_next: bool = Field(..., description="Whether more records are available")
     has_prev: bool = Field(..., description="Whether previous records exist")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page (keyset pagination)")
 
 
 class ResourceListResponse(BaseModel):
@@ -219,6 +276,10 @@ class ResourceListResponse(BaseModel):
     data: List[ResourceSchema]
 
 
+# Validates and serializes a whole batch of ORM rows per call; built once at import
+RESOURCE_LIST_ADAPTER = TypeAdapter(List[ResourceSchema])
+
+
 class ResourceDetailResponse(BaseModel):
     """Single resource with full details."""
     data: ResourceDetailSchema